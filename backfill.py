@@ -0,0 +1,72 @@
+# bulk historical downloads: many symbols in parallel under one request budget, resumable after a crash
+import asyncio
+import time
+import pandas as pd
+import data
+import store
+
+
+class RateBudget:
+    """
+    Global request budget shared by every download: acquire() waits until the next request
+    slot, so all symbols together stay at or under 'rate' requests per second.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._next = 0.0
+
+    async def acquire(self):
+        now = time.monotonic()
+        slot = max(now, self._next)
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def backfill(symbols, start, end, exchange="binance", timeframe="1d", max_concurrency=4, rate=None,
+             retries=3, retry_delay=5.0):
+    """
+    Downloads the history of many crypto symbols into the local store.
+
+    Every page is appended to the store as it arrives, together with a checkpoint (the last
+    saved bar), so a download that is interrupted, or the whole process restarted, picks up
+    right after the checkpoint instead of starting over. Ranges the store already covers are
+    skipped. Symbols that fail are retried from their checkpoint, up to 'retries' times.
+
+    Args:
+        symbols: List of crypto symbols (e.g. ['BTC/USDT', 'ETH/USDT'])
+        start: Start date in 'YYYY-MM-DD' format
+        end: End date in 'YYYY-MM-DD' format
+        exchange: Exchange name (default: 'binance')
+        timeframe: Bar size, e.g. '1m', '1h', '1d' (default: '1d')
+        max_concurrency: Symbols downloading at the same time (default: 4)
+        rate: Maximum requests per second across all symbols (default: None, only the
+              exchange's own rate limit applies)
+        retries: Extra attempts for symbols that failed (default: 3)
+        retry_delay: Seconds to wait before the first retry, doubled on each later one (default: 5.0)
+
+    Returns:
+        List of symbols still incomplete after the last attempt
+    """
+    # The store never marks today as covered (its candle may still be forming), so after the
+    # first pass a symbol only needs retrying if something up to yesterday is still missing
+    settled = min(pd.to_datetime(end).normalize(), pd.Timestamp.now().normalize() - pd.Timedelta(days=1))
+    pending = list(symbols)
+    for attempt in range(retries + 1):
+        pending = [symbol for symbol in pending
+                   if store.missing_ranges(store.coverage(symbol, exchange, timeframe), start,
+                                           end if attempt == 0 else settled)]
+        if not pending:
+            break
+        if attempt > 0:
+            print(f"Retrying {len(pending)} symbol(s) in {retry_delay * 2 ** (attempt - 1):.0f}s")
+            time.sleep(retry_delay * 2 ** (attempt - 1))
+        budget = RateBudget(rate) if rate else None
+        pending = asyncio.run(data._fetchCryptoBatch(pending, start, end, exchange, max_concurrency, timeframe,
+                                                     chunk_size=data.PAGE_LIMIT, budget=budget))
+    for symbol in symbols:
+        saved = store.checkpoint(symbol, exchange, timeframe)
+        status = "incomplete" if symbol in pending else "done"
+        print(f"{symbol}: {status}" + (f" (saved through {saved})" if saved is not None and symbol in pending else ""))
+    return pending
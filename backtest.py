@@ -1,83 +1,108 @@
 from data import getData, getCryptoData
-from indicator import indicator
-import matplotlib.pyplot as plt
+from indicator import score_frame, backtest_signals, _window_dates, CumulativeTables
+import data
+import os
 import pandas as pd
-def backtest(symbol, start, end, initial_investment=10000, asset_type="stock"):
+import numpy as np
+from position import Position
+import metrics
+import results
+import store
+
+def signals_per_bar(df, window_size, asset_type="stock", timeframe="1d"):
     """
-    Backtests a trading strategy on a stock or cryptocurrency.
+    The original per-bar path: calls indicator() once for every bar of a backtest.
+    Returns (labels, strengths) arrays like indicator.backtest_signals.
+    Every bar scores a different frame, so it calls score_frame(), skipping the memo: it could
+    never hit, and fingerprinting each frame would only add work (repeated runs come from the
+    results store).
+    """
+    labels = np.full(len(df), "Hold", dtype=object)
+    strengths = np.zeros(len(df), dtype=np.int64)
+    dates = _window_dates(df.index, data.timeframeDelta(timeframe))
+    for i in range(window_size, len(df)):
+        signal_result = score_frame(df.iloc[:i+1], dates[i - window_size], dates[i], timeframe)
+        labels[i], strengths[i] = signal_result
+    return labels, strengths
+
+def max_drawdown(portfolio_value):
+    """Largest peak-to-trough drop of a portfolio value series, in percent."""
+    values = np.asarray(portfolio_value, dtype=float)
+    if len(values) == 0:
+        return 0.0
+    peaks = np.maximum.accumulate(values)
+    return float(np.max((peaks - values) / peaks) * 100)
+
+def simulate(closes, window_size, signal_labels, signal_strengths, initial_investment=10000, asset_type="stock",
+             stop_loss_pct=0.05, take_profit_pct=0.15, max_signal_strength=3, fifo=False, state=None):
+    """
+    Runs the position and risk logic over precomputed prices and signals.
     
     Args:
-        symbol: Stock symbol (e.g., 'AAPL') or crypto symbol (e.g., 'BTC/USDT')
-        start: Start date in 'YYYY-MM-DD' format
-        end: End date in 'YYYY-MM-DD' format
+        closes: Array of closing prices
+        window_size: First bar to trade on
+        signal_labels: "Buy"/"Sell"/"Hold" per bar
+        signal_strengths: Signal strength per bar
         initial_investment: Starting capital (default: 10000)
-        asset_type: "stock" or "crypto" (default: "stock")
+        asset_type: "stock" (whole shares) or "crypto" (fractional) (default: "stock")
+        stop_loss_pct: Sell everything when price falls this far below the average entry (default: 0.05)
+        take_profit_pct: Sell half when price rises this far above the average entry (default: 0.15)
+        max_signal_strength: Signal strength that invests/sells 100% (default: 3)
+        fifo: Sells consume the oldest lots first instead of keeping the average entry
+              price (default: False)
+        state: Result of an earlier simulate() call to continue from: its cash, position and
+               counts carry over, so a long history can be simulated in consecutive pieces
+               (default: None, start with initial_investment in cash)
     
     Returns:
-        Percentage gain/loss
+        Dict with gain, final_value, cash, shares, avg_entry_price, position, portfolio_value
+        (the equity curve as an array, one value per traded bar), trades (the trade log of this
+        call), signals_generated, trades_executed and max_drawdown
     """
-    total_days = (pd.to_datetime(end) - pd.to_datetime(start)).days
-    window_size = max(1, total_days // 5)
-    
-    # Fetch data based on asset type
-    if asset_type == "crypto":
-        df = getCryptoData(symbol, start=start, end=end)
+    portfolio_value = np.empty(max(0, len(closes) - window_size))
+    trades = []
+    if state is None:
+        cash = initial_investment
+        position = Position(fifo=fifo)
+        signals_generated = {"Buy": 0, "Sell": 0, "Hold": 0}
+        trades_executed = {"Buy": 0, "Sell": 0}
     else:
-        df = getData(symbol, start=start, end=end)
-    if df.empty or len(df) < window_size:
-        print("Not enough data to run backtest.")
-        return None
-    portfolio_value = []
-    cash = initial_investment
-    shares = 0
-    dates = df.index
-    signals_generated = {"Buy": 0, "Sell": 0, "Hold": 0}
-    trades_executed = {"Buy": 0, "Sell": 0}
-    
-    # Risk management: track entry prices for stop loss and take profit
-    entry_prices = []  # Track entry price for each position
-    stop_loss_pct = 0.05  # 5% stop loss
-    take_profit_pct = 0.15  # 15% take profit
-    
-    print(f"Data points: {len(df)}, Window size: {window_size}")
-    print(f"First price: ${df.iloc[0]['close']:.2f}, Last price: ${df.iloc[-1]['close']:.2f}")
-    print(f"Risk management: Stop loss: {stop_loss_pct*100:.0f}%, Take profit: {take_profit_pct*100:.0f}%")
+        cash = state["cash"]
+        position = state["position"]
+        signals_generated = dict(state["signals_generated"])
+        trades_executed = dict(state["trades_executed"])
     
-    for i in range(window_size, len(df)):
-        current_date = dates[i]
-        current_price = df.iloc[i]['close']
+    for i in range(window_size, len(closes)):
+        current_price = closes[i]
         
         # Check stop loss and take profit for existing positions
-        if shares > 0 and len(entry_prices) > 0:
-            avg_entry_price = sum(entry_prices) / len(entry_prices)
+        if position.quantity > 0:
+            avg_entry_price = position.avg_price
             price_change = (current_price - avg_entry_price) / avg_entry_price
             
             # Stop loss: sell if down more than stop_loss_pct
             if price_change <= -stop_loss_pct:
-                cash += shares * current_price
-                shares = 0
-                entry_prices = []
+                cash += position.quantity * current_price
+                trades.append({"index": i, "side": "Sell", "quantity": position.quantity, "price": current_price, "reason": "stop_loss"})
+                position.close()
                 trades_executed["Sell"] += 1
             # Take profit: sell if up more than take_profit_pct
             elif price_change >= take_profit_pct:
                 # Sell 50% to lock in profits, keep 50% for further gains
-                shares_to_sell = shares * 0.5
+                shares_to_sell = position.quantity * 0.5
                 cash += shares_to_sell * current_price
-                shares -= shares_to_sell
-                # Remove half of entry prices
-                entry_prices = entry_prices[:len(entry_prices)//2] if len(entry_prices) > 1 else []
+                position.sell(shares_to_sell)
+                trades.append({"index": i, "side": "Sell", "quantity": shares_to_sell, "price": current_price, "reason": "take_profit"})
                 trades_executed["Sell"] += 1
         
-        # Get the trading signal (returns tuple: (signal_string, signal_strength))
-        signal_result = indicator(df.iloc[:i+1], start=str(dates[i - window_size].date()), end=str(current_date.date()), asset_type=asset_type)
-        signal_str, signal_strength = signal_result
+        # Get the trading signal
+        signal_str, signal_strength = signal_labels[i], int(signal_strengths[i])
         signals_generated[signal_str] = signals_generated.get(signal_str, 0) + 1
         
         if signal_str == "Buy" and cash > 0:
             # Use signal strength to determine position size
             # Signal strength can be 1, 2, or 3 (stronger = invest more)
             # Invest proportionally: +1 = 33%, +2 = 66%, +3 = 100% of available cash
-            max_signal_strength = 3  # Maximum possible signal strength
             position_size_pct = min(1.0, abs(signal_strength) / max_signal_strength)
             cash_to_invest = cash * position_size_pct
             
@@ -86,9 +111,8 @@ def backtest(symbol, start, end, initial_investment=10000, asset_type="stock"):
                 shares_to_buy = cash_to_invest / current_price
                 if shares_to_buy > 0:
                     cash -= cash_to_invest
-                    shares += shares_to_buy
-                    # Track entry price for risk management
-                    entry_prices.extend([current_price] * int(shares_to_buy * 1000))  # Approximate tracking
+                    position.buy(shares_to_buy, current_price)
+                    trades.append({"index": i, "side": "Buy", "quantity": shares_to_buy, "price": current_price, "reason": "signal"})
                     trades_executed["Buy"] += 1
             else:
                 # For stocks, buy whole shares only
@@ -98,45 +122,328 @@ def backtest(symbol, start, end, initial_investment=10000, asset_type="stock"):
                     if shares_to_buy > 0:
                         cash_spent = shares_to_buy * current_price
                         cash -= cash_spent
-                        shares += shares_to_buy
-                        # Track entry price for risk management
-                        entry_prices.extend([current_price] * shares_to_buy)
+                        position.buy(shares_to_buy, current_price)
+                        trades.append({"index": i, "side": "Buy", "quantity": shares_to_buy, "price": current_price, "reason": "signal"})
                         trades_executed["Buy"] += 1
-        elif signal_str == "Sell" and shares > 0:
+        elif signal_str == "Sell" and position.quantity > 0:
             # For selling, use signal strength to determine how much to sell
             # Signal strength can be -1, -2, or -3 (stronger = sell more)
-            max_signal_strength = 3
             sell_pct = min(1.0, abs(signal_strength) / max_signal_strength)
-            shares_to_sell = shares * sell_pct
+            shares_to_sell = position.quantity * sell_pct
             cash += shares_to_sell * current_price
-            shares -= shares_to_sell
-            # Remove corresponding entry prices
-            if len(entry_prices) > 0:
-                num_to_remove = int(len(entry_prices) * sell_pct)
-                entry_prices = entry_prices[num_to_remove:]
+            position.sell(shares_to_sell)
+            trades.append({"index": i, "side": "Sell", "quantity": shares_to_sell, "price": current_price, "reason": "signal"})
             trades_executed["Sell"] += 1
         
         # Always calculate portfolio value (even if stop loss/take profit triggered)
-        portfolio_value.append(cash + shares * current_price)
+        portfolio_value[i - window_size] = cash + position.quantity * current_price
     
-    print(f"Signals generated - Buy: {signals_generated['Buy']}, Sell: {signals_generated['Sell']}, Hold: {signals_generated['Hold']}")
-    print(f"Trades executed - Buy: {trades_executed['Buy']}, Sell: {trades_executed['Sell']}")
-    print(f"Final cash: ${cash:.2f}")
-    if shares > 0:
-        print(f"Final position: {shares:.6f} shares worth ${shares * df.iloc[-1]['close']:.2f}")
-        
-    final_value = portfolio_value[-1]
-    gain = ((final_value - initial_investment) / initial_investment) * 100
+    if len(portfolio_value):
+        final_value = portfolio_value[-1]
+    else:
+        final_value = initial_investment if state is None else state["final_value"]
+    return {
+        "gain": ((final_value - initial_investment) / initial_investment) * 100,
+        "final_value": final_value,
+        "cash": cash,
+        "shares": position.quantity,
+        "avg_entry_price": position.avg_price,
+        "position": position,
+        "portfolio_value": portfolio_value,
+        "trades": trades,
+        "signals_generated": signals_generated,
+        "trades_executed": trades_executed,
+        "max_drawdown": max_drawdown(portfolio_value),
+    }
+
+class ConsoleReporter:
+    """Prints backtest progress and the summary to the console."""
+
+    def message(self, text):
+        print(text)
+
+    def start(self, df, window_size, stop_loss_pct, take_profit_pct, bars=None):
+        print(f"Data points: {len(df) if bars is None else bars}, Window size: {window_size}")
+        print(f"First price: ${df.iloc[0]['close']:.2f}, Last price: ${df.iloc[-1]['close']:.2f}")
+        print(f"Risk management: Stop loss: {stop_loss_pct*100:.0f}%, Take profit: {take_profit_pct*100:.0f}%")
+
+    def finish(self, result):
+        signals_generated = result["signals_generated"]
+        trades_executed = result["trades_executed"]
+        shares = result["shares"]
+        print(f"Signals generated - Buy: {signals_generated['Buy']}, Sell: {signals_generated['Sell']}, Hold: {signals_generated['Hold']}")
+        print(f"Trades executed - Buy: {trades_executed['Buy']}, Sell: {trades_executed['Sell']}")
+        print(f"Final cash: ${result['cash']:.2f}")
+        if shares > 0:
+            print(f"Final position: {shares:.6f} shares worth ${shares * result['last_price']:.2f}")
+        print(f"Final Portfolio Value: ${result['final_value']:.2f}")
+        print(f"Total Gain: {result['gain']:.2f}%")
+
+class NullReporter:
+    """Reports nothing; used for headless runs."""
+
+    def message(self, text):
+        pass
 
-    print(f"Final Portfolio Value: ${final_value:.2f}")
-    print(f"Total Gain: {gain:.2f}%")
+    def start(self, df, window_size, stop_loss_pct, take_profit_pct, bars=None):
+        pass
 
-    plt.plot(dates[window_size:], portfolio_value)
-    asset_label = "Crypto" if asset_type == "crypto" else "Stock"
-    plt.title(f"Backtest of {symbol} ({asset_label}) from {start} to {end}")
+    def finish(self, result):
+        pass
+
+def render_chart(result, path=None):
+    """
+    Plots a backtest's equity curve. Saves it to path when given (no display needed),
+    otherwise opens a window and blocks until it is closed.
+    """
+    import matplotlib
+    if path is not None:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure()
+    plt.plot(result["dates"], result["portfolio_value"])
+    asset_label = "Crypto" if result["asset_type"] == "crypto" else "Stock"
+    plt.title(f"Backtest of {result['symbol']} ({asset_label}) from {result['start']} to {result['end']}")
     plt.xlabel("Date")
     plt.ylabel("Portfolio Value ($)")
     plt.tight_layout()
-    plt.show()
+    if path is None:
+        plt.show()
+    else:
+        fig.savefig(path)
+        plt.close(fig)
+    return path
+
+_chart_pool = None
+
+def render_chart_background(result, path):
+    """
+    Renders a chart to path in a background process so the caller doesn't wait on matplotlib.
+    Returns a concurrent.futures.Future that resolves to the path.
+    """
+    global _chart_pool
+    if _chart_pool is None:
+        from concurrent.futures import ProcessPoolExecutor
+        _chart_pool = ProcessPoolExecutor(max_workers=1)
+    return _chart_pool.submit(render_chart, result, path)
 
-    return gain
\ No newline at end of file
+def backtest(symbol, start, end, initial_investment=10000, asset_type="stock", vectorized=False,
+             stop_loss_pct=0.05, take_profit_pct=0.15, max_signal_strength=3, fifo=False,
+             headless=False, reporter=None, chart=None, timeframe="1d", store_results=True):
+    """
+    Backtests a trading strategy on a stock or cryptocurrency.
+    
+    Args:
+        symbol: Stock symbol (e.g., 'AAPL') or crypto symbol (e.g., 'BTC/USDT')
+        start: Start date in 'YYYY-MM-DD' format
+        end: End date in 'YYYY-MM-DD' format
+        initial_investment: Starting capital (default: 10000)
+        asset_type: "stock" or "crypto" (default: "stock")
+        vectorized: Compute every bar's signal in one pass with indicator.backtest_signals
+                    instead of calling indicator() per bar (default: False). Both give the
+                    same signals; the vectorized path is much faster on long histories.
+        stop_loss_pct: Stop loss as a fraction of the average entry price (default: 0.05)
+        take_profit_pct: Take profit as a fraction of the average entry price (default: 0.15)
+        max_signal_strength: Signal strength that invests/sells 100% (default: 3)
+        fifo: Track FIFO lots for the stop loss/take profit entry price instead of the
+              average cost (default: False)
+        headless: Don't print or show a chart; return the full result dict instead of the gain
+                  (default: False)
+        reporter: Object with message/start/finish methods that receives progress and the
+                  summary (default: ConsoleReporter, or NullReporter when headless)
+        chart: File path to save the equity chart to instead of showing it (default: None)
+        timeframe: Bar size to trade on, e.g. '5m', '1h', '1d'; the signal window is a fifth of
+                   the period counted in these bars (default: '1d')
+        store_results: Record the run in the results store, and return the stored result
+                       instead of recomputing when the same run on the same data exists
+                       (default: True; off everywhere with TRADEBOT_RESULTS=0)
+    
+    Returns:
+        Percentage gain/loss, or when headless the result dict: everything simulate() returns
+        plus symbol, start, end, asset_type, window_size, timeframe, dates, last_price and
+        run_id (the results store id, None when not stored)
+    """
+    if reporter is None:
+        reporter = NullReporter() if headless else ConsoleReporter()
+    total_bars = (pd.to_datetime(end) - pd.to_datetime(start)) // data.timeframeDelta(timeframe)
+    window_size = max(1, total_bars // 5)
+    
+    # Fetch data based on asset type
+    if asset_type == "crypto":
+        df = getCryptoData(symbol, start=start, end=end, timeframe=timeframe)
+    else:
+        df = getData(symbol, start=start, end=end, timeframe=timeframe)
+    if df.empty or len(df) < window_size:
+        reporter.message("Not enough data to run backtest.")
+        return None
+    
+    reporter.start(df, window_size, stop_loss_pct, take_profit_pct)
+    store_results = store_results and results.ENABLED
+    run = {"symbol": symbol, "start": start, "end": end, "asset_type": asset_type, "timeframe": timeframe,
+           "initial_investment": initial_investment, "stop_loss_pct": stop_loss_pct,
+           "take_profit_pct": take_profit_pct, "max_signal_strength": max_signal_strength, "fifo": fifo}
+    stored = results.lookup(run, df) if store_results else None
+    if stored is not None:
+        reporter.message(f"Using stored run {stored['run_id']}")
+        return _report(stored, reporter, headless, chart)
+    
+    with metrics.timer("backtest_signals", engine="vectorized" if vectorized else "per_bar"):
+        if vectorized:
+            signal_labels, signal_strengths = backtest_signals(df, window_size, timeframe)
+        else:
+            signal_labels, signal_strengths = signals_per_bar(df, window_size, asset_type, timeframe)
+    closes = df["close"].to_numpy(dtype=float)
+    with metrics.timer("backtest_loop"):
+        result = simulate(closes, window_size, signal_labels, signal_strengths, initial_investment, asset_type,
+                          stop_loss_pct, take_profit_pct, max_signal_strength, fifo)
+    metrics.inc("backtest_bars", len(closes) - window_size)
+    # The Position object is only needed to continue a simulation
+    del result["position"]
+    result.update({
+        "symbol": symbol,
+        "start": start,
+        "end": end,
+        "asset_type": asset_type,
+        "window_size": window_size,
+        "timeframe": timeframe,
+        "dates": df.index[window_size:],
+        "last_price": closes[-1],
+    })
+    result["run_id"] = results.save(run, df, result) if store_results else None
+    return _report(result, reporter, headless, chart)
+
+def _report(result, reporter, headless, chart):
+    """Reports a finished (or stored) backtest and returns what backtest() returns."""
+    reporter.finish(result)
+
+    if chart is not None or not headless:
+        render_chart(result, chart)
+    if headless:
+        return result
+    return result["gain"]
+
+def backtest_chunked(symbol, start, end, initial_investment=10000, asset_type="stock", stop_loss_pct=0.05,
+                     take_profit_pct=0.15, max_signal_strength=3, fifo=False, timeframe="1d", source=None,
+                     chunk_size=100000, output_dir=None, exact=False, reporter=None):
+    """
+    Out-of-core backtest for histories too long to hold in memory (e.g. years of minute bars).
+    
+    Bars are read from the store chunk_size rows at a time (data.iterBars, downloading missing
+    ranges first). Each chunk is scored together with the window_size bars before it, so every
+    bar sees the same lookback as in backtest(vectorized=True), and the position, cash and
+    drawdown carry over from one chunk to the next. The equity curve is written to disk as it
+    goes (a memory-mapped npy store with a 'value' column), and the trade log to a CSV, so
+    memory holds one chunk plus its lookback instead of the whole history.
+
+    Window sums come from cumulative tables of each chunk, O(1) per window whatever its
+    length, which long intraday histories need (their signal windows run to many thousands of
+    bars). Signals then agree with backtest(vectorized=True) up to floating-point rounding;
+    with exact=True they are reduced exactly as backtest() does, and results are identical.
+    
+    Args:
+        symbol, start, end, initial_investment, asset_type, stop_loss_pct, take_profit_pct,
+        max_signal_strength, fifo, timeframe: As in backtest()
+        source: Data source or exchange to read bars from (default: as getData/getCryptoData)
+        chunk_size: Bars per chunk (default: 100000)
+        output_dir: Directory for equity/ and trades.csv (default: a new temporary directory)
+        exact: Use backtest()'s exact window reductions, O(window) per bar (default: False)
+        reporter: Object with message/start/finish methods that receives progress and the
+                  summary (default: ConsoleReporter; NullReporter reports nothing). The bars are
+                  only known once streamed, so start() then gets a frame of the first and last
+                  bar and the number of bars as bars
+    
+    Returns:
+        Dict like backtest()'s headless result, with portfolio_value and dates memory-mapped from
+        the equity file, and output_dir, equity_path and trades_path instead of the trade log
+    """
+    import tempfile
+
+    if reporter is None:
+        reporter = ConsoleReporter()
+    total_bars = (pd.to_datetime(end) - pd.to_datetime(start)) // data.timeframeDelta(timeframe)
+    window_size = max(1, total_bars // 5)
+    output_dir = output_dir or tempfile.mkdtemp(prefix="tradebot-backtest-")
+    equity_path = os.path.join(output_dir, "equity")
+    trades_path = os.path.join(output_dir, "trades.csv")
+    os.makedirs(output_dir, exist_ok=True)
+    if os.path.exists(trades_path):
+        os.remove(trades_path)
+
+    state = None
+    tail = None     # the last window_size bars seen, the lookback of the next chunk
+    seen = 0        # bars before the current chunk
+    peak = -np.inf
+    drawdown = 0.0
+    last_price = None
+    first_bar = None
+    wrote_equity = False
+    for chunk in data.iterBars(symbol, start, end, asset_type, source, ["close"], timeframe, chunk_size):
+        if first_bar is None:
+            first_bar = chunk.iloc[:1]
+        frame = chunk if tail is None else pd.concat([tail, chunk])
+        offset = seen - (len(frame) - len(chunk))  # bar number of frame's first row
+        first = max(window_size - offset, len(frame) - len(chunk))
+        with metrics.timer("backtest_signals", engine="chunked"):
+            reductions = None if exact else CumulativeTables(frame["close"].to_numpy(dtype=float))
+            labels, strengths = backtest_signals(frame, window_size, timeframe, reductions)
+        closes = frame["close"].to_numpy(dtype=float)
+        with metrics.timer("backtest_loop"):
+            state = simulate(closes, first, labels, strengths, initial_investment, asset_type, stop_loss_pct,
+                             take_profit_pct, max_signal_strength, fifo, state=state)
+        metrics.inc("backtest_bars", max(0, len(closes) - first))
+        values = state["portfolio_value"]
+        if len(values):
+            peaks = np.maximum.accumulate(np.maximum(values, peak))
+            drawdown = max(drawdown, float(np.max((peaks - values) / peaks)))
+            peak = peaks[-1]
+            equity = pd.DataFrame({"value": values}, index=frame.index[first:])
+            if wrote_equity:
+                # Rewriting the whole curve would hold all of it in memory, which this path avoids
+                if not store.append_frame(equity_path, equity):
+                    raise OSError(f"Cannot append to the equity file at {equity_path}")
+            else:
+                store.write_frame(equity_path, equity)
+                wrote_equity = True
+        if state["trades"]:
+            trades = pd.DataFrame(state["trades"])
+            trades["date"] = frame.index[trades["index"].to_numpy()]
+            trades["index"] += offset
+            trades.to_csv(trades_path, mode="a", header=not os.path.exists(trades_path), index=False)
+        last_price = closes[-1]
+        seen += len(chunk)
+        tail = frame.iloc[-window_size:]
+
+    if seen < window_size:
+        reporter.message("Not enough data to run backtest.")
+        return None
+    reporter.start(pd.concat([first_bar, tail.iloc[-1:]]), window_size, stop_loss_pct, take_profit_pct, bars=seen)
+    if not wrote_equity:
+        store.write_frame(equity_path, pd.DataFrame({"value": np.array([], dtype=float)}, index=pd.DatetimeIndex([])))
+    portfolio_value = np.load(os.path.join(equity_path, "value.npy"), mmap_mode="r")
+    dates = np.load(os.path.join(equity_path, "index.npy"), mmap_mode="r").view("datetime64[ns]")
+    result = {
+        "gain": state["gain"],
+        "final_value": state["final_value"],
+        "cash": state["cash"],
+        "shares": state["shares"],
+        "avg_entry_price": state["avg_entry_price"],
+        "portfolio_value": portfolio_value,
+        "signals_generated": state["signals_generated"],
+        "trades_executed": state["trades_executed"],
+        "max_drawdown": drawdown * 100,
+        "symbol": symbol,
+        "start": start,
+        "end": end,
+        "asset_type": asset_type,
+        "window_size": window_size,
+        "timeframe": timeframe,
+        "dates": dates,
+        "last_price": last_price,
+        "bars": seen,
+        "output_dir": output_dir,
+        "equity_path": equity_path,
+        "trades_path": trades_path,
+    }
+    reporter.finish(result)
+    return result
@@ -0,0 +1,225 @@
+"""
+Benchmark suite for data loading, indicators and backtests.
+Runs on synthetic daily OHLCV written to a temporary store, so it never touches the network.
+
+    python bench.py                          # run and write bench_results.json
+    python bench.py --save-baseline          # also store the results as the baseline
+    python bench.py --baseline bench_baseline.json   # compare, exit 1 on regressions
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+END = "2024-12-31"
+YEARS = [1, 5, 20]
+
+
+def synthetic_ohlcv(years, seed=0, end=END, freq="D"):
+    """OHLCV random walk (daily by default) ending at 'end', in the same layout the data layer stores."""
+    rng = np.random.default_rng(seed)
+    bars_per_day = pd.Timedelta(days=1) // pd.to_timedelta(freq if freq[0].isdigit() else f"1{freq}")
+    index = pd.date_range(end=end, periods=int(years * 365 * bars_per_day), freq=freq)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(index))))
+    spread = close * rng.uniform(0, 0.02, len(index))
+    return pd.DataFrame({
+        "open": close + rng.normal(0, 0.005, len(index)) * close,
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+        "volume": rng.uniform(1e5, 1e7, len(index)),
+    }, index=index).astype({"open": "float32", "high": "float32", "low": "float32", "close": "float32"})
+
+
+def timeit(func, repeat=5):
+    """Runs func repeat times and returns timing stats in seconds."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+    return {"median": statistics.median(times), "min": min(times), "runs": repeat}
+
+
+def run(repeat=5):
+    """Runs every benchmark and returns {name: stats}."""
+    import memo
+    import store
+
+    # The benchmarks repoint the store and toggle memoization; put both back afterwards
+    previous_store, memo_enabled = store.STORE_DIR, memo.ENABLED
+    try:
+        with tempfile.TemporaryDirectory(prefix="tradebot-bench-") as workdir:
+            return _run(repeat, workdir)
+    finally:
+        store.STORE_DIR = previous_store
+        if memo_enabled:
+            memo.enable()
+        else:
+            memo.disable()
+
+
+def _run(repeat, workdir):
+    """The benchmarks of run(), with every store and recording kept under workdir."""
+    import data
+    import memo
+    import store
+    import strategies
+    from indicator import indicator
+    from backtest import backtest
+
+    results = {}
+    store.STORE_DIR = os.path.join(workdir, "store")
+    frames = {years: synthetic_ohlcv(years, seed=years) for years in YEARS}
+    for years, df in frames.items():
+        store.write(f"BENCH{years}Y", "alphavantage", df, str(df.index[0].date()), END)
+
+    # Strategies and indicator on one year of bars, computed every time (memoization off)
+    memo.disable()
+    df = frames[1][["close"]].astype(float)
+    start = str(df.index[0].date())
+    results["strategies.movingAverages"] = timeit(lambda: strategies.movingAverages(df, end=END, window=20), repeat * 20)
+    results["strategies.bollingerBands"] = timeit(lambda: strategies.bollingerBands(df, end=END, window=20), repeat * 20)
+    results["strategies.rsi"] = timeit(lambda: strategies.rsi(df, end=END, window=20), repeat * 20)
+    results["indicator.indicator"] = timeit(lambda: indicator(df, start, END), repeat * 20)
+    memo.enable()
+    # Cold path with memoization on: fingerprinting plus the computation
+    results["indicator.indicator.memo_miss"] = timeit(lambda: (memo.clear(), indicator(df, start, END)), repeat * 20)
+    indicator(df, start, END)
+    results["indicator.indicator.memo_hit"] = timeit(lambda: indicator(df, start, END), repeat * 20)
+    memo.disable()
+
+    # Full backtests read from the store, headless
+    for years, frame in frames.items():
+        symbol = f"BENCH{years}Y"
+        start = str(frame.index[0].date())
+        results[f"backtest.vectorized.{years}y"] = timeit(
+            lambda: backtest(symbol, start, END, vectorized=True, headless=True, store_results=False), repeat)
+    start = str(frames[1].index[0].date())
+    results["backtest.per_bar.1y"] = timeit(lambda: backtest("BENCH1Y", start, END, headless=True, store_results=False), 1)
+    # The same run again, answered from the results store
+    start = str(frames[20].index[0].date())
+    backtest("BENCH20Y", start, END, vectorized=True, headless=True)
+    results["backtest.stored.20y"] = timeit(lambda: backtest("BENCH20Y", start, END, vectorized=True, headless=True),
+                                            repeat)
+
+    # Monte Carlo: 1000 block-bootstrapped paths of 5 years, one process
+    from montecarlo import monte_carlo
+    start = str(frames[5].index[0].date())
+    results["montecarlo.1000paths.5y"] = timeit(
+        lambda: monte_carlo("BENCH5Y", start, END, n_paths=1000, seed=0, max_workers=1), 1)
+
+    # Cache reads of 20 years of bars in each available format
+    formats = ["npy", "csv"]
+    try:
+        import pyarrow  # noqa: F401
+        formats.append("feather")
+    except ImportError:
+        pass
+    previous = store.FORMAT
+    try:
+        for fmt in formats:
+            store.FORMAT = fmt
+            store.write("BENCH20Y", "alphavantage", frames[20], str(frames[20].index[0].date()), END)
+            results[f"store.read.{fmt}.20y"] = timeit(lambda: store.read("BENCH20Y", "alphavantage"), repeat * 4)
+    finally:
+        store.FORMAT = previous
+
+    # Fetch pipeline against recorded bars: 30 days of 1m candles paged through a ReplayProvider
+    # into an empty store, chunk by chunk
+    replay = data.ReplayProvider(os.path.join(workdir, "replay"))
+    minutes = synthetic_ohlcv(30 / 365, seed=7, freq="min")
+    replay.record("BENCH/USDT", minutes, "1m")
+    bench_store = store.STORE_DIR
+    fetches = itertools.count()
+
+    def replay_fetch():
+        store.STORE_DIR = os.path.join(workdir, f"fetch{next(fetches)}")
+        data.getCryptoData("BENCH/USDT", start=str(minutes.index[0].date()), end=END, timeframe="1m")
+    data.useProviders([replay])
+    try:
+        results["fetch.replay.1m.30d"] = timeit(replay_fetch, repeat)
+    finally:
+        data.useProviders(None)
+        store.STORE_DIR = bench_store
+
+    # Cold start of a fresh interpreter: importing the indicator, and the signal CLI on cached bars
+    env = dict(os.environ, TRADEBOT_STORE=store.STORE_DIR, TRADEBOT_STORE_FORMAT=store.FORMAT)
+    here = os.path.dirname(os.path.abspath(__file__))
+    start = str(frames[1].index[0].date())
+    results["cold_start.import_indicator"] = timeit(
+        lambda: subprocess.run([sys.executable, "-c", "import indicator"], cwd=here, env=env, check=True), repeat)
+    results["cold_start.cli_signal"] = timeit(
+        lambda: subprocess.run([sys.executable, "-m", "tradebot", "signal", "BENCH1Y", "--start", start, "--end", END],
+                               cwd=here, env=env, check=True, stdout=subprocess.DEVNULL), repeat)
+    return results
+
+
+def compare(results, baseline, threshold=1.25):
+    """
+    Compares median timings against a baseline. Returns the list of (name, ratio) that got
+    slower than threshold x baseline.
+    """
+    regressions = []
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+        ratio = stats["median"] / baseline[name]["median"]
+        marker = "  REGRESSION" if ratio > threshold else ""
+        print(f"{name:<36} {baseline[name]['median']*1000:10.3f} ms -> {stats['median']*1000:10.3f} ms  x{ratio:.2f}{marker}")
+        if ratio > threshold:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TradeBot benchmark suite (offline, synthetic data)")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the results JSON")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Also write the results to bench_baseline.json")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio that counts as a regression")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per benchmark")
+    args = parser.parse_args(argv)
+
+    results = run(args.repeat)
+    report = {
+        "meta": {
+            "timestamp": pd.Timestamp.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    for name, stats in results.items():
+        print(f"{name:<36} {stats['median']*1000:10.3f} ms (min {stats['min']*1000:.3f} ms, {stats['runs']} runs)")
+    print(f"Results written to {args.output}")
+    if args.save_baseline:
+        with open("bench_baseline.json", "w") as f:
+            json.dump(report, f, indent=2)
+        print("Baseline written to bench_baseline.json")
+
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        print(f"\nCompared with {args.baseline}:")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) slower than x{args.threshold} baseline")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,14 +15,12 @@ def example_crypto_signals():
     end = "2025-12-31"
     
     print("Running crypto signal analysis...")
+    # Download all symbols concurrently up front; indicator() then reads them from the store
+    data.getCryptoDataBatch(cryptos, start=start, end=end)
     results = {}
     for crypto in cryptos:
         try:
-            signal_result = indicator.indicator(crypto, start, end, asset_type="crypto")
-            if isinstance(signal_result, tuple) and len(signal_result) == 2:
-                signal_str, signal_strength = signal_result
-            else:
-                signal_str, signal_strength = "Hold", 0
+            signal_str, signal_strength = indicator.indicator(crypto, start, end, asset_type="crypto")
             results[crypto] = f"{signal_str} (strength: {signal_strength})"
             print(f"{crypto}: {signal_str} (strength: {signal_strength})")
         except Exception as exc:
@@ -66,6 +64,7 @@ def example_compare_cryptos():
     end = "2025-12-31"
     
     print("\nComparing cryptocurrency backtests...")
+    data.getCryptoDataBatch(cryptos, start=start, end=end)
     results = {}
     for crypto in cryptos:
         print(f"\nBacktesting {crypto}...")
@@ -0,0 +1,199 @@
+# long-running signal service: warm price series, coalesced requests, latency percentiles
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+import pandas as pd
+import data
+import metrics
+from indicator import indicator
+
+
+class SignalService:
+    """
+    Answers indicator() queries from price series kept in memory.
+
+    Each (asset type, symbol, timeframe) series is loaded once over the widest range asked
+    for so far and reused by every later query inside that range; a query for bars after
+    the last one loaded reloads the series once it is older than 'refresh' seconds. Results
+    are kept per series version, so a repeated query is a dictionary lookup. Concurrent
+    identical loads and computations share one future, so a burst of requests for the same
+    symbol does the work once. Loading and scoring run in worker threads, off the event loop.
+    """
+
+    def __init__(self, max_series=256, max_results=4096, refresh=60.0, latency_window=10000):
+        self.max_series = max_series
+        self.max_results = max_results
+        self.refresh = refresh
+        self._series = OrderedDict()   # (asset_type, symbol, timeframe) -> [df, start, end, loaded_at, version]
+        self._results = OrderedDict()  # (series key, version, start, end) -> (signal, strength)
+        self._inflight = {}            # load or result key -> Future
+        self._latencies = deque(maxlen=latency_window)
+        self._counts = {"requests": 0, "errors": 0, "coalesced": 0, "loads": 0, "computations": 0}
+        self._versions = 0
+
+    async def _shared(self, key, compute):
+        """Runs compute() in a worker thread, or joins the run already in flight for key."""
+        future = self._inflight.get(key)
+        if future is not None:
+            self._counts["coalesced"] += 1
+            metrics.inc("daemon_coalesced")
+            return await asyncio.shield(future)
+        future = asyncio.get_running_loop().run_in_executor(None, compute)
+        self._inflight[key] = future
+        try:
+            return await future
+        finally:
+            del self._inflight[key]
+
+    def _fresh(self, entry, start, end):
+        df, lo, hi, loaded_at, _ = entry
+        if start < lo or end > hi:
+            return False
+        last = df.index[-1] if len(df) else lo
+        return end <= last or time.monotonic() - loaded_at < self.refresh
+
+    async def series(self, symbol, start, end, asset_type="stock", timeframe="1d"):
+        """Returns (close frame, version) of a series covering start..end, loading it if needed."""
+        key = (asset_type, symbol, timeframe)
+        start = pd.to_datetime(start)
+        end = pd.to_datetime(end)
+        while True:
+            entry = self._series.get(key)
+            if entry is not None and self._fresh(entry, start, end):
+                self._series.move_to_end(key)
+                return entry[0], entry[4]
+            lo = min(start, entry[1]) if entry is not None else start
+            hi = max(end, entry[2]) if entry is not None else end
+
+            def load():
+                fetch = data.getCryptoData if asset_type == "crypto" else data.getData
+                return fetch(symbol, start=lo.strftime("%Y-%m-%d %H:%M:%S"), end=hi.strftime("%Y-%m-%d %H:%M:%S"),
+                             columns=["close"], timeframe=timeframe)
+
+            loaded = await self._shared(("load",) + key, load)
+            if self._series.get(key) is entry:
+                # First waiter to wake up installs the frame; the others find it on the next pass
+                self._counts["loads"] += 1
+                self._versions += 1
+                frame = loaded.set_axis(pd.to_datetime(loaded.index)).sort_index()
+                self._series[key] = [frame, lo, hi, time.monotonic(), self._versions]
+                self._series.move_to_end(key)
+                while len(self._series) > self.max_series:
+                    self._series.popitem(last=False)
+
+    async def signal(self, symbol, start, end, asset_type="stock", timeframe="1d"):
+        """Returns indicator(symbol, start, end, asset_type, timeframe) as (signal, strength)."""
+        df, version = await self.series(symbol, start, end, asset_type, timeframe)
+        key = ((asset_type, symbol, timeframe), version, start, end)
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+            return result
+
+        result = await self._shared(key, lambda: indicator(df, start, end, timeframe=timeframe))
+        if key not in self._results:
+            self._counts["computations"] += 1
+            self._results[key] = result
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+        return result
+
+    def record(self, seconds, error=False):
+        self._counts["requests"] += 1
+        if error:
+            self._counts["errors"] += 1
+        self._latencies.append(seconds)
+        metrics.observe("daemon_request", seconds)
+
+    def stats(self):
+        """Returns request counts, warm series and results, and latency percentiles in milliseconds."""
+        latencies = np.array(self._latencies) * 1000
+        percentiles = {}
+        if len(latencies):
+            for name, q in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100)):
+                percentiles[name] = float(np.percentile(latencies, q))
+        return {**self._counts, "series": len(self._series), "results": len(self._results),
+                "latency_ms": percentiles}
+
+
+async def _handle(service, reader, writer):
+    """Minimal HTTP/1.1 with keep-alive: GET /signal, /stats and /metrics."""
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            keep_alive = True
+            while True:
+                header = await reader.readline()
+                if header in (b"\r\n", b"\n", b""):
+                    break
+                if header.lower().startswith(b"connection:") and b"close" in header.lower():
+                    keep_alive = False
+            t0 = time.perf_counter()
+            parts = request_line.decode("latin-1").split()
+            url = urlsplit(parts[1] if len(parts) > 1 else "/")
+            query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            status, content_type = 200, "application/json"
+            error = False
+            if url.path == "/signal":
+                try:
+                    signal, strength = await service.signal(query["symbol"], query["start"], query["end"],
+                                                            query.get("asset_type", "stock"),
+                                                            query.get("timeframe", "1d"))
+                    body = {"symbol": query["symbol"], "signal": signal, "strength": strength}
+                except KeyError as e:
+                    status, body, error = 400, {"error": f"missing parameter {e}"}, True
+                except ValueError as e:
+                    status, body, error = 502, {"error": str(e)}, True
+                except Exception as e:
+                    # Keep serving other requests; report the failure to this client
+                    status, body, error = 500, {"error": f"{type(e).__name__}: {e}"}, True
+                body = json.dumps(body, default=float)
+                service.record(time.perf_counter() - t0, error)
+            elif url.path == "/stats":
+                body = json.dumps(service.stats())
+            elif url.path == "/metrics":
+                body, content_type = metrics.prometheus(), "text/plain; version=0.0.4"
+            else:
+                status, body = 404, json.dumps({"error": "not found"})
+            payload = body.encode()
+            reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error",
+                      502: "Bad Gateway"}[status]
+            writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n"
+                         f"Content-Length: {len(payload)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}"
+                         f"\r\n\r\n".encode() + payload)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+        # Client went away, or the server is shutting down
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host="127.0.0.1", port=8765, unix_socket=None, service=None):
+    """
+    Serves signals over HTTP until cancelled, on host:port or on a Unix socket:
+
+        GET /signal?symbol=AAPL&start=2024-01-01&end=2024-12-31[&asset_type=crypto][&timeframe=1h]
+        GET /stats    request counts and latency percentiles (p50/p90/p99/max, ms)
+        GET /metrics  metrics.prometheus() text
+    """
+    service = service or SignalService()
+
+    async def handle(reader, writer):
+        await _handle(service, reader, writer)
+
+    if unix_socket:
+        server = await asyncio.start_unix_server(handle, path=unix_socket)
+    else:
+        server = await asyncio.start_server(handle, host, port)
+    where = unix_socket or f"http://{host}:{port}"
+    print(f"Serving signals on {where}")
+    async with server:
+        await server.serve_forever()
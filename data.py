@@ -1,174 +1,619 @@
 # getting data from Alpha Vantage API
 import pandas as pd 
 import os
-from dotenv import load_dotenv
-import requests
-import yfinance as yf
-import ccxt
+import time
+import store
+import metrics
 
-load_dotenv()  
-alphaKey = os.getenv('alphaKey')
+# The providers (requests, yfinance, ccxt) and the .env file are only loaded when a download
+# actually happens, so reading bars that are already in the store stays cheap to import
+alphaKey = None
 
-def getData(stock, start = "2022-06-06", end = "2023-01-01", source="alphavantage"):
-    """Fetches stock data from Alpha Vantage API or yfinance for a given stock symbol and date range.
-    Returns a DataFrame with the closing prices for the specified date range."""
-    cache_file = f"cache_{stock}_{start}_{end}_{source}.csv"
-    if os.path.exists(cache_file):
-        df = pd.read_csv(cache_file, index_col=0, parse_dates=True)
-        return df
-    if source == "alphavantage":
-        url = 'https://www.alphavantage.co/query'
-        params = {
-            "function": "TIME_SERIES_DAILY",
+def _alphaKey():
+    """Returns the Alpha Vantage key from the environment (or .env), loading it on first use."""
+    global alphaKey
+    if alphaKey is None:
+        from dotenv import load_dotenv
+        load_dotenv()
+        alphaKey = os.getenv('alphaKey')
+    return alphaKey
+
+# Bars are kept as full OHLCV: float32 prices, float64 volume, int64 (datetime64[ns]) index
+OHLCV_DTYPES = store.OHLCV_DTYPES
+
+def _toOHLCV(df):
+    """Casts a frame of bars to the compact OHLCV layout, keeping whichever OHLCV columns it has."""
+    if df.empty:
+        return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in OHLCV_DTYPES.items()},
+                            index=pd.DatetimeIndex([]))
+    columns = [col for col in OHLCV_DTYPES if col in df.columns]
+    return df[columns].astype({col: OHLCV_DTYPES[col] for col in columns})
+
+def _project(df, columns):
+    """Returns only the requested columns (all of them when columns is None)."""
+    return df if columns is None else df[list(columns)]
+
+# Bar sizes are ccxt-style timeframe strings: '1m', '5m', '15m', '1h', '4h', '1d', '1w', ...
+_TIMEFRAME_UNITS = {"m": "min", "h": "h", "d": "D", "w": "W"}
+
+def timeframeDelta(timeframe):
+    """Returns the length of one bar of a timeframe string as a Timedelta, e.g. '5m' -> 5 minutes."""
+    match = store._TIMEFRAME.match(timeframe)
+    if not match:
+        raise ValueError(f"Unknown timeframe: {timeframe}")
+    count, unit = match.groups()
+    return pd.Timedelta(int(count), unit=_TIMEFRAME_UNITS[unit])
+
+def resampleOHLCV(df, timeframe):
+    """
+    Builds bars of a larger timeframe from smaller ones: first open, highest high, lowest low,
+    last close and summed volume per period. Periods start at midnight (weeks on Monday, like
+    exchange candles) and are labelled by their start; periods without bars are dropped.
+    """
+    bar = timeframeDelta(timeframe)
+    rule = "W-MON" if timeframe.endswith("w") and bar == pd.Timedelta(weeks=1) else bar
+    aggregations = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    df = df.resample(rule, label="left", closed="left").agg(
+        {col: how for col, how in aggregations.items() if col in df.columns})
+    return _toOHLCV(df.dropna(subset=["close"]))
+
+def _inRange(df, start, end):
+    """Rows dated from start through the whole of end's day."""
+    return df[(df.index >= pd.to_datetime(start)) &
+              (df.index < pd.to_datetime(end).normalize() + pd.Timedelta(days=1))]
+
+def _alphaVantageFrame(payload, start, end):
+    """Turns an Alpha Vantage time series response into an OHLCV frame limited to start..end."""
+    ts_key = next((key for key in payload if key.startswith("Time Series")), None)
+    if ts_key is None:
+        print("API response:", payload)
+        raise KeyError("'Time Series' not found in API response.")
+    df = pd.DataFrame.from_dict(payload[ts_key], orient="index")
+    df.index = pd.to_datetime(df.index)
+    df = _inRange(df.sort_index(), start, end)
+    df = df.apply(pd.to_numeric)
+    df = df.rename(columns={"1. open": "open", "2. high": "high", "3. low": "low",
+                            "4. close": "close", "5. volume": "volume"})
+    return _toOHLCV(df)
+
+def _alphaVantageRequest(params):
+    import requests
+    params = dict(params, apikey=_alphaKey())
+    with metrics.timer("fetch", source="alphavantage"):
+        r = requests.get('https://www.alphavantage.co/query', params)
+    metrics.inc("fetch_requests", source="alphavantage")
+    metrics.inc("fetch_bytes", len(r.content), source="alphavantage")
+    return r.json()
+
+def _fetchAlphaVantage(stock, start, end):
+    """Downloads daily bars for a stock from Alpha Vantage between start and end (inclusive)."""
+    payload = _alphaVantageRequest({
+        "function": "TIME_SERIES_DAILY",
+        "symbol": stock,
+        "outputsize": "compact",
+    })
+    return _alphaVantageFrame(payload, start, end)
+
+# Alpha Vantage's intraday intervals
+_ALPHAVANTAGE_INTERVALS = {"1m": "1min", "5m": "5min", "15m": "15min", "30m": "30min", "1h": "60min"}
+
+def _fetchAlphaVantageIntraday(stock, start, end, timeframe):
+    """Downloads intraday bars from Alpha Vantage one month per request, yielding each month's frame."""
+    if timeframe not in _ALPHAVANTAGE_INTERVALS:
+        raise ValueError(f"Alpha Vantage has no {timeframe} bars")
+    for month in pd.period_range(pd.to_datetime(start), pd.to_datetime(end), freq="M"):
+        payload = _alphaVantageRequest({
+            "function": "TIME_SERIES_INTRADAY",
             "symbol": stock,
-            "outputsize": "compact",
-            "apikey": alphaKey
-        }
-        r = requests.get(url, params)
-        data = r.json()
-        # Extract time series data
-        ts_key = "Time Series (Daily)"
-        if ts_key not in data:
-            print("API response:", data)
-            raise KeyError(f"'{ts_key}' not found in API response.")   
-        ts_data = data[ts_key]
-        df = pd.DataFrame.from_dict(ts_data, orient="index")
-        df.index = pd.to_datetime(df.index)
-        df = df.sort_index()
-        # Filter by date range
-        df = df[(df.index >= pd.to_datetime(start)) & (df.index <= pd.to_datetime(end))]
-        df = df.apply(pd.to_numeric)
-        df = df.apply(pd.to_numeric)
-        df = df.rename(columns={"4. close": "close"}) 
-        df = df[["close"]]  # Keep only close column
-        df.to_csv(cache_file)
-        return df
-    elif source == "yfinance":
-        df = yf.download(stock, start=start, end=end)
-        df = df[["Close"]]
-        df.columns = ["close"]
-        df.dropna(inplace=True)
-        df.to_csv(cache_file)
-        return df
-
-def getCryptoData(crypto_symbol, start="2022-06-06", end="2023-01-01", exchange="binance"):
+            "interval": _ALPHAVANTAGE_INTERVALS[timeframe],
+            "month": str(month),
+            "outputsize": "full",
+        })
+        yield _alphaVantageFrame(payload, start, end)
+
+def _fetchYfinance(symbol, start, end, timeframe="1d"):
+    """Downloads bars from yfinance between start and end (inclusive)."""
+    import yfinance as yf
+    # yfinance treats end as exclusive, so ask for one more day
+    end = pd.to_datetime(end) + pd.Timedelta(days=1)
+    interval = {"1w": "1wk"}.get(timeframe, timeframe)
+    with metrics.timer("fetch", source="yfinance"):
+        df = yf.download(symbol, start=start, end=end, interval=interval, progress=False)
+    metrics.inc("fetch_requests", source="yfinance")
+    if df.empty:
+        return _toOHLCV(df)
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)  # (field, ticker) columns for one ticker
+    if df.index.tz is not None:
+        df.index = df.index.tz_convert(None)  # intraday bars come in exchange time; store UTC
+    df = df.rename(columns=str.lower)
+    df = df.dropna(subset=["close"])
+    return _toOHLCV(df)
+
+# One ccxt instance per exchange, so market metadata and rate-limit state survive between calls
+_exchanges = {}
+
+def _exchange(exch):
+    """Returns the pooled ccxt instance for an exchange, creating it on first use."""
+    if exch not in _exchanges:
+        import ccxt
+        exchange_class = getattr(ccxt, exch)
+        _exchanges[exch] = exchange_class({
+            'enableRateLimit': True,
+        })
+    return _exchanges[exch]
+
+def _ohlcvFrame(all_ohlcv, start, end):
+    """Turns raw ccxt candles into an OHLCV frame limited to start..end (inclusive)."""
+    df = pd.DataFrame(all_ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    df.set_index('timestamp', inplace=True)
+    df = df.sort_index()
+    
+    # Remove duplicates
+    df = df[~df.index.duplicated(keep='last')]
+    
+    df = _inRange(df, start, end)
+    df = df.dropna(subset=["close"])
+    return _toOHLCV(df)
+
+# Candles per page requested from an exchange, and candles per chunk written to the store
+PAGE_LIMIT = 1000
+CHUNK_SIZE = 50000
+
+def _pageWindow(start, end, timeframe):
+    """Returns (first ms timestamp, ms timestamp past the end of end's day, ms per bar)."""
+    start_ts = int(pd.to_datetime(start).timestamp() * 1000)
+    end_ts = int((pd.to_datetime(end).normalize() + pd.Timedelta(days=1)).timestamp() * 1000)
+    return start_ts, end_ts, int(timeframeDelta(timeframe).total_seconds() * 1000)
+
+class _Pages:
+    """
+    The shared pagination policy, apart from how a page is requested: the next page starts
+    one bar after the last candle received, paging stops at the end of end's day or when the
+    provider has nothing newer, and candles are handed out as a frame every chunk_size so long
+    intraday histories are written to the store as they arrive instead of being held in memory.
+    """
+
+    def __init__(self, start, end, timeframe, chunk_size):
+        self.start = start
+        self.end = end
+        self.chunk_size = chunk_size
+        self.since, self._end_ts, self._step = _pageWindow(start, end, timeframe)
+        self._batch = []
+
+    def more(self):
+        """True while there are candles left to request, from self.since."""
+        return self.since < self._end_ts
+
+    def add(self, ohlcv):
+        """Takes the page requested from self.since. Returns a frame when a chunk is complete, else None."""
+        # Stop when the provider has nothing newer (pages may be shorter than page_limit,
+        # so a short page alone doesn't mean the history is done)
+        if not ohlcv or ohlcv[-1][0] < self.since:
+            self.since = self._end_ts
+            return None
+        self._batch.extend(ohlcv)
+        self.since = ohlcv[-1][0] + self._step
+        return self.rest() if len(self._batch) >= self.chunk_size else None
+
+    def rest(self):
+        """Returns the candles not handed out yet as a frame, or None if there are none."""
+        if not self._batch:
+            return None
+        frame = _ohlcvFrame(self._batch, self.start, self.end)
+        self._batch = []
+        return frame
+
+def _paginate(provider, symbol, start, end, timeframe="1d", chunk_size=CHUNK_SIZE):
+    """
+    Pages through provider.fetch_page from start to the end of end's day, yielding a frame
+    every chunk_size candles (see _Pages).
+    """
+    pages = _Pages(start, end, timeframe, chunk_size)
+    while pages.more():
+        chunk = pages.add(provider.fetch_page(symbol, pages.since, provider.page_limit, timeframe))
+        if chunk is not None:
+            yield chunk
+    chunk = pages.rest()
+    if chunk is not None:
+        yield chunk
+
+async def _paginateAsync(provider, symbol, start, end, timeframe="1d", chunk_size=CHUNK_SIZE, budget=None):
+    """
+    _paginate() through provider.fetch_page_async, for many symbols downloading concurrently.
+    budget, if given, is awaited before every request (see backfill.RateBudget).
+    """
+    pages = _Pages(start, end, timeframe, chunk_size)
+    while pages.more():
+        if budget is not None:
+            await budget.acquire()
+        chunk = pages.add(await provider.fetch_page_async(symbol, pages.since, provider.page_limit, timeframe))
+        if chunk is not None:
+            yield chunk
+    chunk = pages.rest()
+    if chunk is not None:
+        yield chunk
+
+async def _fetchCryptoBatch(crypto_symbols, start, end, exchange, max_concurrency, timeframe="1d",
+                            chunk_size=CHUNK_SIZE, budget=None):
+    """
+    Downloads the missing ranges of every symbol concurrently through the exchange's provider
+    (one async session, see Provider.open) and writes them to the store chunk by chunk, resuming
+    interrupted downloads from their checkpoint. Returns the symbols that failed.
+    """
+    import asyncio
+    provider = _provider(exchange, crypto=True)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    failed = []
+    
+    async def fetchSymbol(symbol):
+        async with semaphore:
+            try:
+                # A second pass downloads the rest again when the bars replaced an older store layout
+                for attempt in range(2):
+                    relayout = False
+                    for gap_start, gap_end in store.missing_ranges(store.coverage(symbol, provider.name, timeframe),
+                                                                   start, end):
+                        fetch_start = store.resume_from(symbol, provider.name, gap_start, gap_end, timeframe)
+                        async for chunk in _paginateAsync(provider, provider.symbol(symbol), fetch_start, gap_end,
+                                                          timeframe, chunk_size, budget):
+                            relayout |= store.append(symbol, provider.name, chunk, gap_start, timeframe)
+                        store.write(symbol, provider.name, store._empty(), gap_start, gap_end, timeframe)
+                    if not relayout:
+                        break
+            except Exception as e:
+                print(f"Error fetching {symbol} from {exchange}: {e}")
+                metrics.inc("fetch_errors", exchange=exchange)
+                failed.append(symbol)
+    
+    await provider.open()
+    try:
+        await asyncio.gather(*(fetchSymbol(symbol) for symbol in crypto_symbols))
+    finally:
+        await provider.close()
+    return failed
+
+def _storedBase(symbol, source, start, end, timeframe):
+    """
+    Returns the largest stored timeframe that divides timeframe and fully covers start..end,
+    or None. Bars of that timeframe can be resampled instead of downloading again.
+    """
+    bar = timeframeDelta(timeframe)
+    candidates = []
+    for stored in store.timeframes(symbol, source):
+        stored_bar = timeframeDelta(stored)
+        if stored_bar < bar and bar % stored_bar == pd.Timedelta(0) and \
+                not store.missing_ranges(store.coverage(symbol, source, stored), start, end):
+            candidates.append((stored_bar, stored))
+    return max(candidates)[1] if candidates else None
+
+def _getBars(symbol, source, start, end, fetch, timeframe, base_timeframe):
+    """
+    Serves timeframe bars from the store. They're resampled from base_timeframe bars when given
+    (downloading those if needed), or from a finer timeframe the store already covers;
+    otherwise timeframe bars are downloaded directly. fetch(s, e, timeframe) downloads bars.
+    """
+    base = base_timeframe
+    if base is None and store.missing_ranges(store.coverage(symbol, source, timeframe), start, end):
+        base = _storedBase(symbol, source, start, end, timeframe)
+    base = base or timeframe
+    df = store.get(symbol, source, start, end, lambda s, e: fetch(s, e, base), timeframe=base)
+    return df if base == timeframe else resampleOHLCV(df, timeframe)
+
+class Provider:
+    """
+    A source of OHLCV bars. Subclasses set name (the source the store keys their bars by) and
+    either implement fetch(), or set page_limit and implement fetch_page() to use the shared
+    pagination.
+    """
+    name = None
+    page_limit = PAGE_LIMIT
+
+    def symbol(self, symbol):
+        """Maps a symbol to this provider's format (unchanged by default)."""
+        return symbol
+
+    def fetch(self, symbol, start, end, timeframe="1d"):
+        """
+        Downloads bars between start and end (inclusive): a DataFrame, or an iterable of
+        DataFrames in time order that the store writes as they arrive.
+        """
+        return _paginate(self, symbol, start, end, timeframe)
+
+    def fetch_page(self, symbol, since, limit, timeframe):
+        """Returns up to limit [ms timestamp, open, high, low, close, volume] candles from since (ms)."""
+        raise NotImplementedError
+
+    async def open(self):
+        """Starts the session fetch_page_async uses (nothing by default); close() ends it."""
+
+    async def close(self):
+        pass
+
+    async def fetch_page_async(self, symbol, since, limit, timeframe):
+        """fetch_page() for concurrent downloads; runs fetch_page in a worker thread by default."""
+        import asyncio
+        return await asyncio.to_thread(self.fetch_page, symbol, since, limit, timeframe)
+
+class AlphaVantageProvider(Provider):
+    name = "alphavantage"
+
+    def fetch(self, symbol, start, end, timeframe="1d"):
+        if timeframe == "1d":
+            return _fetchAlphaVantage(symbol, start, end)
+        return _fetchAlphaVantageIntraday(symbol, start, end, timeframe)
+
+class YfinanceProvider(Provider):
+    name = "yfinance"
+
+    def symbol(self, symbol):
+        # Exchange pairs to yfinance format: BTC/USDT -> BTC-USD (yfinance quotes in USD, not USDT)
+        if '/' not in symbol:
+            return symbol
+        base, quote = symbol.split('/')
+        return f"{base}-USD" if quote.upper() == 'USDT' else f"{base}-{quote}"
+
+    def fetch(self, symbol, start, end, timeframe="1d"):
+        return _fetchYfinance(symbol, start, end, timeframe)
+
+class CcxtProvider(Provider):
+    """
+    Any ccxt exchange, e.g. CcxtProvider('binance'), through the pooled sync instance, or for
+    async downloads through one ccxt.async_support instance opened by open().
+    """
+
+    def __init__(self, exchange):
+        self.name = exchange
+        self._async = None
+
+    def _counted(self, exchange_instance, ohlcv):
+        if metrics.ENABLED:
+            metrics.inc("fetch_requests", exchange=self.name)
+            metrics.inc("fetch_bytes", len(exchange_instance.last_http_response or ""), exchange=self.name)
+        return ohlcv
+
+    def fetch_page(self, symbol, since, limit, timeframe):
+        exchange_instance = _exchange(self.name)
+        with metrics.timer("fetch", exchange=self.name):
+            ohlcv = exchange_instance.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
+        return self._counted(exchange_instance, ohlcv)
+
+    async def open(self):
+        import ccxt.async_support as ccxt_async
+        self._async = getattr(ccxt_async, self.name)({
+            'enableRateLimit': True,
+        })
+
+    async def close(self):
+        if self._async is not None:
+            await self._async.close()
+            self._async = None
+
+    async def fetch_page_async(self, symbol, since, limit, timeframe):
+        # The instance's throttler spaces out requests from every coroutine sharing it
+        with metrics.timer("fetch", exchange=self.name):
+            ohlcv = await self._async.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
+        return self._counted(self._async, ohlcv)
+
+class ReplayProvider(Provider):
+    """
+    Serves recorded OHLCV files instead of a live API, for deterministic offline runs,
+    benchmarks and load tests. Files are CSVs in directory named like the store's keys without
+    the source (BTC_USDT.csv for daily bars, BTC_USDT_5m.csv for 5 minute bars). Requests go
+    through the same pagination as an exchange and each one sleeps 'latency' seconds.
+    """
+
+    def __init__(self, directory, latency=0.0, page_limit=PAGE_LIMIT, name="replay"):
+        self.directory = directory
+        self.latency = latency
+        self.page_limit = page_limit
+        self.name = name
+        self._loaded = {}  # (symbol, timeframe) -> (ms timestamps, candle rows)
+
+    def _path(self, symbol, timeframe):
+        key = symbol.replace('/', '_')
+        return os.path.join(self.directory, f"{key}.csv" if timeframe == "1d" else f"{key}_{timeframe}.csv")
+
+    def record(self, symbol, df, timeframe="1d"):
+        """Saves bars as the recording served for symbol and timeframe."""
+        os.makedirs(self.directory, exist_ok=True)
+        _toOHLCV(df).to_csv(self._path(symbol, timeframe))
+        self._loaded.pop((symbol, timeframe), None)
+
+    def _load(self, symbol, timeframe):
+        if (symbol, timeframe) not in self._loaded:
+            df = pd.read_csv(self._path(symbol, timeframe), index_col=0, parse_dates=True).sort_index()
+            timestamps = pd.DatetimeIndex(df.index).as_unit("ms").asi8
+            rows = df.reindex(columns=['open', 'high', 'low', 'close', 'volume']).to_numpy(dtype=float)
+            self._loaded[(symbol, timeframe)] = (timestamps, rows)
+        return self._loaded[(symbol, timeframe)]
+
+    def fetch_page(self, symbol, since, limit, timeframe):
+        timestamps, rows = self._load(symbol, timeframe)
+        with metrics.timer("fetch", source=self.name):
+            if self.latency:
+                time.sleep(self.latency)
+            lo = timestamps.searchsorted(since, side="left")
+            page = [[int(ts), *row] for ts, row in zip(timestamps[lo:lo + limit], rows[lo:lo + limit].tolist())]
+        metrics.inc("fetch_requests", source=self.name)
+        return page
+
+# Registered providers by name; ccxt exchanges are added on first use
+_providers = {"alphavantage": AlphaVantageProvider(), "yfinance": YfinanceProvider()}
+# Sources tried after the requested one, in order
+STOCK_FALLBACKS = ["yfinance"]
+CRYPTO_FALLBACKS = ["coinbase", "kraken", "kucoin", "yfinance"]
+# When set, every request uses this provider chain instead (e.g. a ReplayProvider).
+# TRADEBOT_REPLAY=<directory> (with TRADEBOT_REPLAY_LATENCY seconds per request) replays recordings.
+_override = None
+if os.getenv("TRADEBOT_REPLAY"):
+    _override = [ReplayProvider(os.environ["TRADEBOT_REPLAY"], float(os.getenv("TRADEBOT_REPLAY_LATENCY", "0")))]
+
+def register(provider):
+    """Makes a provider available by its name, e.g. as getData(..., source=provider.name)."""
+    _providers[provider.name] = provider
+
+def useProviders(chain):
+    """
+    Routes every data request through the given list of providers, in fallback order, e.g.
+    useProviders([ReplayProvider("recordings")]) for offline runs. None restores the defaults.
+    """
+    global _override
+    _override = list(chain) if chain is not None else None
+
+def _provider(name, crypto=False):
+    if name not in _providers:
+        if not crypto:
+            raise ValueError(f"Unknown data source: {name}")
+        _providers[name] = CcxtProvider(name)
+    return _providers[name]
+
+def _chain(asset_type, source=None, fallback=True):
+    """
+    The providers a request tries, in order: the useProviders() chain when set, otherwise source
+    (default 'binance' for crypto, 'alphavantage' for stocks) followed by CRYPTO_FALLBACKS or
+    STOCK_FALLBACKS (unless fallback=False).
+    """
+    if _override is not None:
+        return _override
+    crypto = asset_type == "crypto"
+    names = [source or ("binance" if crypto else "alphavantage")]
+    if fallback:
+        names += CRYPTO_FALLBACKS if crypto else STOCK_FALLBACKS
+    return [_provider(name, crypto=crypto) for name in dict.fromkeys(names)]
+
+def _withFallback(symbol, chain, load, has_bars=lambda df: not df.empty):
+    """
+    The shared fallback policy: calls load(provider, provider_symbol) for each provider in turn
+    and returns the first result that has_bars. Provider errors are counted and moving on to the
+    next provider counts as a retry. Returns the last result without bars if no provider had
+    any, and raises ValueError if every provider failed.
+    """
+    errors = []
+    empty = None
+    for provider in chain:
+        try:
+            loaded = load(provider, provider.symbol(symbol))
+        except Exception as e:
+            metrics.inc("fetch_errors", source=provider.name)
+            metrics.inc("fetch_retries", source=provider.name)
+            errors.append(f"{provider.name}: {e}")
+            continue
+        if has_bars(loaded):
+            return loaded
+        empty = loaded
+    if empty is not None:
+        return empty
+    raise ValueError(f"Could not fetch data for {symbol} from any source. Errors: {'; '.join(errors)}")
+
+def _fetchWithFallback(symbol, start, end, chain, timeframe, base_timeframe):
+    """Serves start..end bars from the store through the first provider in chain that has them."""
+    def load(provider, provider_symbol):
+        return _getBars(provider_symbol, provider.name, start, end,
+                        lambda s, e, tf: provider.fetch(provider_symbol, s, e, tf), timeframe, base_timeframe)
+    return _withFallback(symbol, chain, load)
+
+def getData(stock, start = "2022-06-06", end = "2023-01-01", source="alphavantage", columns=None,
+            timeframe="1d", base_timeframe=None, fallback=True):
+    """Fetches stock data from Alpha Vantage API or yfinance for a given stock symbol and date range.
+    Returns a DataFrame with open/high/low/close/volume for the specified date range, or only
+    the given columns (e.g. columns=["close"]).
+    Bars are kept in a local store per symbol, source and timeframe; only the parts of the range
+    that have never been downloaded are fetched. Bars of a larger timeframe (e.g. '1h') are
+    resampled from base_timeframe bars, or from a finer timeframe already in the store.
+    If source fails or has no bars, the STOCK_FALLBACKS sources are tried (unless fallback=False)."""
+    chain = _chain("stock", source, fallback)
+    return _project(_fetchWithFallback(stock, start, end, chain, timeframe, base_timeframe), columns)
+
+def getCryptoData(crypto_symbol, start="2022-06-06", end="2023-01-01", exchange="binance", columns=None,
+                  timeframe="1d", base_timeframe=None):
     """
     Fetches cryptocurrency data from a crypto exchange (default: Binance) using ccxt.
-    Returns a DataFrame with the closing prices for the specified date range.
+    Returns a DataFrame with open/high/low/close/volume for the specified date range.
+    Bars are kept in a local store per symbol and exchange; only the parts of the range that
+    have never been downloaded are fetched. If the exchange fails or has no bars, the
+    CRYPTO_FALLBACKS sources are tried in order (other exchanges, then yfinance).
     
     Args:
         crypto_symbol: Crypto symbol (e.g., 'BTC/USDT', 'ETH/USDT', or 'BTC-USD' for yfinance)
         start: Start date in 'YYYY-MM-DD' format
         end: End date in 'YYYY-MM-DD' format
         exchange: Exchange name (default: 'binance'). Options: 'binance', 'coinbase', 'kraken', etc.
+        columns: Only return these columns, e.g. ["close"] (default: all OHLCV columns)
+        timeframe: Bar size, e.g. '1m', '5m', '1h', '1d' (default: '1d')
+        base_timeframe: Download and store bars of this smaller timeframe and resample them to
+                        timeframe (default: None, use stored finer bars if they cover the range)
     
     Returns:
-        DataFrame with 'close' column and datetime index
+        DataFrame with OHLCV columns (float32 prices, float64 volume) and datetime index
     """
-    cache_file = f"cache_{crypto_symbol.replace('/', '_')}_{start}_{end}_{exchange}.csv"
-    if os.path.exists(cache_file):
-        df = pd.read_csv(cache_file, index_col=0, parse_dates=True)
-        return df
-    
-    # Try multiple exchanges as fallback
-    exchanges_to_try = [exchange, 'coinbase', 'kraken', 'kucoin']
-    if exchange in exchanges_to_try:
-        exchanges_to_try = list(dict.fromkeys(exchanges_to_try))  # Remove duplicates while preserving order
+    chain = _chain("crypto", exchange)
+    return _project(_fetchWithFallback(crypto_symbol, start, end, chain, timeframe, base_timeframe), columns)
+
+def iterBars(symbol, start, end, asset_type="stock", source=None, columns=None, timeframe="1d",
+             chunk_size=CHUNK_SIZE):
+    """
+    Yields the bars of symbol between start and end as DataFrames of at most chunk_size rows,
+    for histories too long to load at once. Missing ranges are first downloaded into the
+    store page by page, then the bars are read back from it one chunk at a time, so memory
+    use doesn't grow with the length of the range. Bars are stored and read at timeframe
+    itself (no resampling). Providers are tried in the same order as getData (stocks, with
+    source defaulting to 'alphavantage') or getCryptoData (crypto, source being the exchange,
+    default 'binance'); raises ValueError if every provider failed.
+    """
+    def load(provider, provider_symbol):
+        store.fill(provider_symbol, provider.name, start, end,
+                   lambda s, e: provider.fetch(provider_symbol, s, e, timeframe), timeframe)
+        chunks = store.read_chunks(provider_symbol, provider.name, start, end, timeframe, chunk_size)
+        return next(chunks, None), chunks
+
+    first, chunks = _withFallback(symbol, _chain(asset_type, source), load, lambda loaded: loaded[0] is not None)
+    if first is None:
+        return
+    yield _project(first, columns)
+    for chunk in chunks:
+        yield _project(chunk, columns)
+
+def getCryptoDataBatch(crypto_symbols, start="2022-06-06", end="2023-01-01", exchange="binance", columns=None, max_concurrency=10,
+                       timeframe="1d"):
+    """
+    Fetches several cryptocurrencies at once. Missing ranges are downloaded concurrently with
+    asyncio through a single ccxt exchange instance, which keeps the exchange's rate limit for
+    all of them. Symbols the exchange can't serve fall back to getCryptoData one at a time
+    (other exchanges, then yfinance). With useProviders() in effect, every symbol goes
+    through getCryptoData.
     
-    for exch in exchanges_to_try:
-        try:
-            # Initialize the exchange
-            exchange_class = getattr(ccxt, exch)
-            exchange_instance = exchange_class({
-                'enableRateLimit': True,
-            })
-            
-            # Convert dates to timestamps (milliseconds)
-            start_ts = int(pd.to_datetime(start).timestamp() * 1000)
-            end_ts = int(pd.to_datetime(end).timestamp() * 1000)
-            
-            # Fetch OHLCV data with pagination
-            all_ohlcv = []
-            current_ts = start_ts
-            limit = 1000  # Most exchanges limit to 1000 candles per request
-            
-            while current_ts < end_ts:
-                ohlcv = exchange_instance.fetch_ohlcv(
-                    crypto_symbol,
-                    timeframe='1d',
-                    since=current_ts,
-                    limit=limit
-                )
-                
-                if not ohlcv:
-                    break
-                    
-                all_ohlcv.extend(ohlcv)
-                
-                # Move to the next batch (last timestamp + 1 day)
-                current_ts = ohlcv[-1][0] + (24 * 60 * 60 * 1000)
-                
-                # Avoid infinite loops
-                if len(ohlcv) < limit:
-                    break
-            
-            if not all_ohlcv:
-                continue  # Try next exchange
-            
-            # Convert to DataFrame
-            df = pd.DataFrame(all_ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
-            df = df.sort_index()
-            
-            # Remove duplicates
-            df = df[~df.index.duplicated(keep='last')]
-            
-            # Filter by date range
-            df = df[(df.index >= pd.to_datetime(start)) & (df.index <= pd.to_datetime(end))]
-            
-            # Keep only close column
-            df = df[["close"]]
-            df.dropna(inplace=True)
-            
-            if not df.empty:
-                # Save to cache
-                df.to_csv(cache_file)
-                return df
-                
-        except Exception as e:
-            if exch == exchanges_to_try[-1]:  # Last exchange, will try yfinance
-                print(f"Error fetching crypto data from {exch}: {e}")
-            continue
+    Args:
+        crypto_symbols: List of crypto symbols (e.g., ['BTC/USDT', 'ETH/USDT'])
+        start: Start date in 'YYYY-MM-DD' format
+        end: End date in 'YYYY-MM-DD' format
+        exchange: Exchange name (default: 'binance')
+        columns: Only return these columns, e.g. ["close"] (default: all OHLCV columns)
+        max_concurrency: Maximum number of symbols downloading at the same time (default: 10)
+        timeframe: Bar size, e.g. '1m', '5m', '1h', '1d' (default: '1d')
     
-    # Fallback to yfinance (supports crypto like BTC-USD, ETH-USD)
-    print("Note: Exchanges (Binance, Coinbase, etc.) are unavailable or blocked in your location.")
-    print("Falling back to yfinance for crypto data...")
-    try:
-        # Convert exchange format to yfinance format (BTC/USDT -> BTC-USD)
-        if '/' in crypto_symbol:
-            base, quote = crypto_symbol.split('/')
-            # yfinance typically uses USD as quote, not USDT
-            if quote.upper() == 'USDT':
-                yf_symbol = f"{base}-USD"
-            else:
-                yf_symbol = f"{base}-{quote}"
-        else:
-            yf_symbol = crypto_symbol
-        
-        # Update cache file name for yfinance
-        cache_file = f"cache_{yf_symbol.replace('-', '_')}_{start}_{end}_yfinance.csv"
-        if os.path.exists(cache_file):
-            df = pd.read_csv(cache_file, index_col=0, parse_dates=True)
-            return df
-        
-        df = yf.download(yf_symbol, start=start, end=end, progress=False)
+    Returns:
+        Dict of symbol -> DataFrame. Symbols that no source could provide are left out.
+    """
+    import asyncio
+    # Only open an exchange session when some symbol actually has a gap in the store
+    pending = [symbol for symbol in crypto_symbols
+               if store.missing_ranges(store.coverage(symbol, exchange, timeframe), start, end)]
+    if _override is not None:
+        failed = list(crypto_symbols)
+    else:
+        failed = asyncio.run(_fetchCryptoBatch(pending, start, end, exchange, max_concurrency, timeframe)) if pending else []
+    results = {}
+    for symbol in crypto_symbols:
+        df = store.read(symbol, exchange, start, end, timeframe) if symbol not in failed else None
+        if df is None or df.empty:
+            try:
+                df = getCryptoData(symbol, start=start, end=end, exchange=exchange, timeframe=timeframe)
+            except ValueError as e:
+                print(e)
+                continue
         if df.empty:
-            raise ValueError(f"Could not fetch data for {crypto_symbol} from any source")
-        df = df[["Close"]]
-        df.columns = ["close"]
-        df.dropna(inplace=True)
-        df.to_csv(cache_file)
-        return df
-    except Exception as e:
-        raise ValueError(f"Could not fetch data for {crypto_symbol} from any source. Last error: {e}")
+            continue
+        results[symbol] = _project(df, columns)
+    return results
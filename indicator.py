@@ -1,75 +1,27 @@
+import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 import data
 import strategies
-def indicator(stock_or_df, start, end, asset_type="stock"):
+import metrics
+import memo
+def score_components(MAs, current_price, bb_upper, bb_lower, rsi, recent_low=None):
     """
-    Uses a variety of strategies to generate indicators for a given stock or crypto which
-    can be used for trading decisions.
+    Turns the indicator components into a signal. Shared by indicator() and the streaming
+    indicator so both apply exactly the same rules.
     
     Args:
-        stock_or_df: Stock symbol, crypto symbol, or DataFrame
-        start: Start date
-        end: End date
-        asset_type: "stock" or "crypto" (default: "stock")
+        MAs: The five moving averages, oldest window first
+        current_price: Latest close
+        bb_upper: Upper Bollinger Band
+        bb_lower: Lower Bollinger Band
+        rsi: RSI value
+        recent_low: Lowest close of the last 10 bars (None if there are fewer)
+    
+    Returns:
+        Tuple of (signal_string, signal_strength)
     """
-    if isinstance(stock_or_df, pd.DataFrame):
-        df = stock_or_df.copy()
-    else:
-        # If stock_or_df is a string, fetch data
-        symbol = stock_or_df
-        if asset_type == "crypto":
-            try:
-                df = data.getCryptoData(symbol, start=start, end=end)
-            except:
-                # Fallback: try yfinance format (e.g., BTC-USD)
-                df = data.getData(symbol, start=start, end=end, source="yfinance")
-        else:
-            # Default to stock
-            try:
-                df = data.getData(symbol, start=start, end=end)
-            except:
-                df = data.getData(symbol, start=start, end=end, source="yfinance")
-
-    df.index = pd.to_datetime(df.index)
-    df = df.sort_index()
-
     signal = 0
-
-    # Set up the windows so that there are 5 windows of equal size and the ends of these windows are in
-    # window_ends variable
-    start = pd.to_datetime(start)
-    end = pd.to_datetime(end)
-    total_days = (end - start).days
-    
-    # Filter dataframe to the date range
-    df_filtered = df[(df.index >= start) & (df.index <= end)]
-    
-    # Calculate window size based on available data
-    # We need at least 5 windows, so window_size should be total_days // 5
-    # But we also want at least 5 data points per window for meaningful analysis
-    window_size = max(5, total_days // 5)
-    
-    # If we don't have enough data points, reduce window size
-    if len(df_filtered) < window_size * 5:
-        # Adjust window size to fit available data
-        window_size = max(3, len(df_filtered) // 5)
-        if window_size < 3 or len(df_filtered) < 10:
-            return "Hold"  # Not enough data for analysis
-    
-    window_ends = []
-    for i in range(5):
-        window_ends.append(start + pd.Timedelta(days=window_size * (i + 1)))
-    
-    MAs = []
-    for window_end in window_ends:
-        # Filter data up to window_end
-        df_window = df_filtered[df_filtered.index <= window_end]
-        if len(df_window) < window_size:
-            # Use all available data if not enough
-            MA = strategies.movingAverages(df_window, end=window_end, window=min(window_size, len(df_window)))
-        else:
-            MA = strategies.movingAverages(df_window, end=window_end, window=window_size)
-        MAs.append(MA)
     maTrend = "neutral"
     # Improved trend detection: stronger weight for recent trends
     recent_trend = (MAs[4] - MAs[0]) / MAs[0] if MAs[0] > 0 else 0  # Percentage change
@@ -87,31 +39,21 @@ def indicator(stock_or_df, start, end, asset_type="stock"):
         if MAs[4] < MAs[3] * 0.98:  # Recent acceleration
             signal -= 1
     
-    bbSignal = strategies.bollingerBands(df_filtered, end = end, window = window_size)
-    current_price = df_filtered.iloc[-1]["close"] if len(df_filtered) > 0 else 0
-    
     # Improved Bollinger Bands logic: buy when oversold in uptrend, sell when overbought in downtrend
-    if len(df_filtered) > 0 and len(bbSignal) > 0:
-        bb_upper = bbSignal["upper"].iloc[0]
-        bb_lower = bbSignal["lower"].iloc[0]
-        bb_middle = bbSignal["mean"].iloc[0]
+    # Buy signal: price below lower band in uptrend (oversold bounce opportunity)
+    if current_price < bb_lower and maTrend == "up":
+        signal += 1
+    # Strong buy: price well below lower band
+    if current_price < bb_lower * 0.98:
+        signal += 1
         
-        # Buy signal: price below lower band in uptrend (oversold bounce opportunity)
-        if current_price < bb_lower and maTrend == "up":
-            signal += 1
-        # Strong buy: price well below lower band
-        if current_price < bb_lower * 0.98:
-            signal += 1
-            
-        # Sell signal: price above upper band in downtrend (overbought in weak market)
-        if current_price > bb_upper and maTrend == "down":
-            signal -= 1
-        # Strong sell: price well above upper band
-        if current_price > bb_upper * 1.02:
-            signal -= 1
-    
-    rsi = strategies.rsi(df_filtered, end = end, window = window_size)
-    
+    # Sell signal: price above upper band in downtrend (overbought in weak market)
+    if current_price > bb_upper and maTrend == "down":
+        signal -= 1
+    # Strong sell: price well above upper band
+    if current_price > bb_upper * 1.02:
+        signal -= 1
+
     # Improved RSI logic: more nuanced signals
     # Buy when RSI is oversold (<30) especially in uptrend (dip buying)
     if rsi < 30:
@@ -134,9 +76,7 @@ def indicator(stock_or_df, start, end, asset_type="stock"):
         signal -= 1  # Extreme overbought
     
     # RSI divergence: if price is making new lows but RSI is rising (bullish)
-    if len(df_filtered) >= 10:
-        recent_low = df_filtered["close"].tail(10).min()
-        recent_high = df_filtered["close"].tail(10).max()
+    if recent_low is not None:
         price_change = (current_price - recent_low) / recent_low if recent_low > 0 else 0
         if price_change > 0.05 and rsi < 50 and maTrend == "up":  # Price recovering, RSI not overbought
             signal += 1
@@ -147,5 +87,427 @@ def indicator(stock_or_df, start, end, asset_type="stock"):
         return ("Sell", signal)
     else:
         return ("Hold", 0)
+
+def indicator(stock_or_df, start, end, asset_type="stock", timeframe="1d"):
+    """
+    Uses a variety of strategies to generate indicators for a given stock or crypto which
+    can be used for trading decisions.
+    
+    Args:
+        stock_or_df: Stock symbol, crypto symbol, or DataFrame
+        start: Start date (or timestamp, for intraday bars)
+        end: End date (or timestamp, for intraday bars)
+        asset_type: "stock" or "crypto" (default: "stock")
+        timeframe: Bar size, e.g. '5m', '1h', '1d'; window lengths are counted in these bars
+                   (default: '1d')
+    
+    Returns:
+        Tuple of (signal_string, signal_strength); ("Hold", 0) when there are too few bars to score
+    """
+    if isinstance(stock_or_df, pd.DataFrame):
+        df = stock_or_df
+    else:
+        # If stock_or_df is a string, fetch data
+        symbol = stock_or_df
+        # The data layer falls back through other providers (ending with yfinance) on failure
+        if asset_type == "crypto":
+            df = data.getCryptoData(symbol, start=start, end=end, timeframe=timeframe)
+        else:
+            df = data.getData(symbol, start=start, end=end, timeframe=timeframe)
+    return _score_frame_memoized(df, start, end, timeframe)
+
+
+def score_frame(df, start, end, timeframe="1d"):
+    """
+    indicator() on a price frame, computed every time. indicator() goes through a memoized
+    copy (keyed by the frame's content and the arguments); call this directly when every frame
+    is new, as in a per-bar backtest, where fingerprinting each one would only add work.
+    """
+    df = df.copy()
+    metrics.inc("indicator_evaluations", engine="scalar")
+    df.index = pd.to_datetime(df.index)
+    df = df.sort_index()
+    # Prices may be stored as float32; score in float64
+    df["close"] = df["close"].astype(float)
+
+    # Set up the windows so that there are 5 windows of equal size and the ends of these windows are in
+    # window_ends variable
+    start = pd.to_datetime(start)
+    end = pd.to_datetime(end)
+    bar = data.timeframeDelta(timeframe)
+    total_days = (end - start) // bar  # in bars; days for daily bars
+    
+    # Filter dataframe to the date range
+    df_filtered = df[(df.index >= start) & (df.index <= end)]
+    
+    # Calculate window size based on available data
+    # We need at least 5 windows, so window_size should be total_days // 5
+    # But we also want at least 5 data points per window for meaningful analysis
+    window_size = max(5, total_days // 5)
+    
+    # If we don't have enough data points, reduce window size
+    if len(df_filtered) < window_size * 5:
+        # Adjust window size to fit available data
+        window_size = max(3, len(df_filtered) // 5)
+        if window_size < 3 or len(df_filtered) < 10:
+            return ("Hold", 0)  # Not enough data for analysis
+    
+    window_ends = []
+    for i in range(5):
+        window_ends.append(start + bar * (window_size * (i + 1)))
+    
+    with metrics.timer("strategies"):
+        MAs = []
+        for window_end in window_ends:
+            # Filter data up to window_end
+            df_window = df_filtered[df_filtered.index <= window_end]
+            if len(df_window) < window_size:
+                # Use all available data if not enough
+                MA = strategies.movingAverages(df_window, end=window_end, window=min(window_size, len(df_window)))
+            else:
+                MA = strategies.movingAverages(df_window, end=window_end, window=window_size)
+            MAs.append(MA)
+
+        bbSignal = strategies.bollingerBands(df_filtered, end = end, window = window_size)
+        rsi = strategies.rsi(df_filtered, end = end, window = window_size)
+    current_price = df_filtered.iloc[-1]["close"] if len(df_filtered) > 0 else 0
+    recent_low = df_filtered["close"].tail(10).min() if len(df_filtered) >= 10 else None
+    return score_components(MAs, current_price, bbSignal["upper"].iloc[0], bbSignal["lower"].iloc[0], rsi, recent_low)
+
+
+_score_frame_memoized = memo.memoize(score_frame)
+
+
+# Most values _window_reduce gathers into one array of windows (8 bytes each)
+_BLOCK_SIZE = 1 << 22
+
+
+def _window_reduce(values, ends, lengths, func, first=None):
+    """
+    Applies func to the windows values[end - length:end] for every (end, length) pair.
+    Windows of equal length are gathered into one 2-D array and reduced together, so every
+    window is summed in the same order as the equivalent pandas call on a single slice.
+    If first is given it replaces the first element of every window before reducing.
+    Empty windows give 0. Windows are gathered at most _BLOCK_SIZE values at a time, so memory
+    stays bounded however many long windows there are (e.g. a backtest over minute bars).
+    """
+    out = np.zeros(len(ends))
+    for length in np.unique(lengths):
+        if length <= 0:
+            continue
+        view = sliding_window_view(values, length)
+        rows = np.flatnonzero(lengths == length)
+        step = max(1, _BLOCK_SIZE // length)
+        for block in range(0, len(rows), step):
+            positions = rows[block:block + step]
+            windows = view[ends[positions] - length]
+            if first is not None:
+                windows[:, 0] = first
+            out[positions] = func(windows)
+    return out
+
+
+def _mean(windows):
+    return windows.sum(axis=1) / windows.shape[1]
+
+
+def _std(windows):
+    # Same two-pass sample variance pandas uses for Series.std()
+    count = windows.shape[1]
+    if count < 2:
+        return np.full(len(windows), np.nan)
+    avg = windows.sum(axis=1) / count
+    sqr = (windows - avg[:, None]) ** 2
+    return np.sqrt(sqr.sum(axis=1) / (count - 1))
+
+
+class _ExactReductions:
+    """The window reductions _score_ranges uses by default, exact to the pandas calls indicator() makes."""
+
+    def __init__(self, close):
+        self.close = close
+        # The leading diff is NaN, which counts as 0
+        delta = np.concatenate(([0.0], np.diff(close)))
+        self.gains = np.where(delta > 0, delta, 0.0)
+        self.losses = np.where(delta < 0, -delta, 0.0)
+
+    def mean(self, hi, length):
+        return _window_reduce(self.close, hi, length, _mean)
+
+    def std(self, hi, length):
+        return _window_reduce(self.close, hi, length, _std)
+
+    def gain(self, hi, length):
+        # A window's first diff reaches back past the window, so it counts as 0
+        return _window_reduce(self.gains, hi, length, _mean, first=0.0)
+
+    def loss(self, hi, length):
+        return _window_reduce(self.losses, hi, length, _mean, first=0.0)
+
+    def low10(self, hi, has_ten):
+        return _window_reduce(self.close, hi, np.where(has_ten, 10, 0), lambda w: w.min(axis=1))
+
+
+class CumulativeTables:
+    """
+    Prefix sums of a close series, of its squares and of its gains and losses, plus the rolling
+    10-bar low: the mean, standard deviation and RSI averages of any window become O(1)
+    lookups, whatever its length. Build once per symbol and pass as 'reductions' to
+    backtest_signals to score many window sizes without re-reducing every window.
+    Sums are taken around the series mean, so values agree with the exact reductions to
+    rounding error (a signal can only differ where a component sits exactly on a threshold).
+    close may also be a 2-D array of many price paths (paths x bars); every lookup then
+    returns one row per path.
+    """
+
+    def __init__(self, close):
+        close = np.asarray(close, dtype=float)
+        self._shift = close.mean(axis=-1, keepdims=True) if close.shape[-1] else np.zeros(close.shape[:-1] + (1,))
+        centered = close - self._shift
+        self._sum = self._prefix(centered)
+        self._sqr = self._prefix(centered ** 2)
+        # The leading diff is NaN, which counts as 0
+        delta = np.diff(close, axis=-1, prepend=close[..., :1])
+        self._gain = self._prefix(np.where(delta > 0, delta, 0.0))
+        self._loss = self._prefix(np.where(delta < 0, -delta, 0.0))
+        self._low10 = np.zeros(close.shape)
+        if close.shape[-1] >= 10:
+            self._low10[..., 9:] = sliding_window_view(close, 10, axis=-1).min(axis=-1)
+
+    @staticmethod
+    def _prefix(values):
+        return np.concatenate((np.zeros(values.shape[:-1] + (1,)), np.cumsum(values, axis=-1)), axis=-1)
+
+    def _window_sum(self, table, hi, length, skip=0):
+        lo = np.minimum(hi - length + skip, hi)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(length > 0, (table[..., hi] - table[..., lo]) / length, 0.0)
+
+    def mean(self, hi, length):
+        return np.where(length > 0, self._window_sum(self._sum, hi, length) + self._shift, 0.0)
+
+    def std(self, hi, length):
+        mean = self._window_sum(self._sum, hi, length)
+        sqr = self._window_sum(self._sqr, hi, length)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            var = np.maximum(sqr - mean * mean, 0.0) * length / (length - 1)
+        return np.where(length >= 2, np.sqrt(var), np.nan)
+
+    def gain(self, hi, length):
+        return self._window_sum(self._gain, hi, length, skip=1)
+
+    def loss(self, hi, length):
+        return self._window_sum(self._loss, hi, length, skip=1)
+
+    def low10(self, hi, has_ten):
+        return np.where(has_ten, self._low10[..., np.maximum(hi - 1, 0)], 0.0)
+
+
+def _score_windows(df, starts, ends, limits, bar=pd.Timedelta(days=1), reductions=None):
+    """
+    Vectorized version of indicator() for many (start, end) windows over the same price frame.
+    Row j is scored as indicator(df.iloc[:limits[j]], starts[j], ends[j]) would score it.
+    
+    Args:
+        df: DataFrame with 'close' column and a sorted datetime index
+        starts: DatetimeIndex of window start dates
+        ends: DatetimeIndex of window end dates
+        limits: Exclusive row limit for each window (rows at or past it are never used)
+        bar: Bar length the window sizes are counted in (default: one day)
+        reductions: CumulativeTables of df's closes to use instead of the exact reductions
+    
+    Returns:
+        Dict of numpy arrays: 'strength' plus the component values ('ma0'..'ma4', 'bb_mean',
+        'bb_upper', 'bb_lower', 'rsi', 'price') and 'valid' (False where indicator() holds
+        for lack of data)
+    """
+    index = pd.DatetimeIndex(df.index)
+    close = df["close"].to_numpy(dtype=float)
+    limits = np.asarray(limits, dtype=np.int64)
+
+    def bars_through(timestamps):
+        return index.searchsorted(timestamps, side="right")
+
+    lo = index.searchsorted(starts, side="left")
+    hi = np.minimum(bars_through(ends), limits)
+    return _score_ranges(close, starts, ends, lo, hi, bars_through, bar, reductions)
+
+
+def _score_ranges(close, starts, ends, lo, hi, bars_through, bar=pd.Timedelta(days=1), reductions=None):
+    """
+    Scores windows given as row ranges of a close array: window j covers close[lo[j]:hi[j]],
+    which are the bars dated starts[j]..ends[j]. bars_through(timestamps) must return, for
+    each window, the exclusive row position just past its last bar dated at or before the
+    given timestamp. Window means, deviations and lows come from reductions (exact by
+    default, or a CumulativeTables of close). Returns the same dict as _score_windows.
+    close may be a 2-D array of price paths (paths x bars) sharing one calendar when
+    reductions is a CumulativeTables of it; the outputs then have one row per path.
+    """
+    if reductions is None:
+        reductions = _ExactReductions(close)
+    hi = np.maximum(hi, lo)
+    count = hi - lo
+    valid = count >= 10
+    metrics.inc("indicator_evaluations", len(hi), engine="vectorized")
+
+    # Window size: total_days // 5, shrunk to count // 5 when there aren't enough bars
+    total_days = np.asarray((ends - starts) // bar, dtype=np.int64)
+    window_size = np.maximum(5, total_days // 5)
+    window_size = np.where(count < window_size * 5, np.maximum(3, count // 5), window_size)
+
+    # Five moving averages over the bars up to each window end
+    MAs = []
+    for i in range(5):
+        window_ends = starts + pd.to_timedelta(window_size * (i + 1) * bar.value, unit="ns")
+        window_hi = np.minimum(bars_through(window_ends), hi)
+        window_hi = np.maximum(window_hi, lo)
+        length = np.minimum(window_size, window_hi - lo)
+        MAs.append(reductions.mean(window_hi, length))
+    up = (MAs[4] >= MAs[3]) & (MAs[3] >= MAs[2]) & (MAs[2] >= MAs[1]) & (MAs[1] >= MAs[0])
+    down = ~up & (MAs[4] <= MAs[3]) & (MAs[3] <= MAs[2]) & (MAs[2] <= MAs[1]) & (MAs[1] <= MAs[0])
+    neutral = ~up & ~down
+
+    current_price = np.where(count > 0, close[..., np.maximum(hi - 1, 0)], 0.0)
+    signal = np.zeros(current_price.shape, dtype=np.int64)
+    signal += up
+    signal += up & (MAs[4] > MAs[3] * 1.02)
+    signal -= down
+    signal -= down & (MAs[4] < MAs[3] * 0.98)
+
+    # Bollinger Bands over the last window_size bars
+    length = np.minimum(window_size, count)
+    bb_mean = reductions.mean(hi, length)
+    bb_std = reductions.std(hi, length)
+    bb_std = np.where(np.isnan(bb_std) | (bb_std == 0), 0.01, bb_std)
+    bb_upper = bb_mean + (bb_std * 2)
+    bb_lower = bb_mean - (bb_std * 2)
+
+    signal += (current_price < bb_lower) & up
+    signal += current_price < bb_lower * 0.98
+    signal -= (current_price > bb_upper) & down
+    signal -= current_price > bb_upper * 1.02
+
+    # RSI over the last window_size + 1 bars
+    length = np.minimum(window_size + 1, count)
+    gain = reductions.gain(hi, length)
+    loss = reductions.loss(hi, length)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = np.where(loss != 0, gain / loss, 0.0)
+    rsi = np.where(length < 2, 50.0, 100 - (100 / (1 + rs)))
+
+    signal += np.where(rsi < 30, np.where(up, 2, np.where(neutral, 1, 0)), 0)
+    signal -= np.where(rsi > 70, np.where(down, 2, np.where(neutral, 1, 0)), 0)
+
+    # Price recovering off the 10-bar low while RSI isn't overbought
+    recent_low = reductions.low10(hi, count >= 10)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        price_change = np.where(recent_low > 0, (current_price - recent_low) / recent_low, 0.0)
+    signal += (count >= 10) & (price_change > 0.05) & (rsi < 50) & up
+
+    signal = np.where(valid, signal, 0)
+    return {
+        "strength": signal,
+        "valid": valid,
+        "ma0": MAs[0], "ma1": MAs[1], "ma2": MAs[2], "ma3": MAs[3], "ma4": MAs[4],
+        "bb_mean": bb_mean, "bb_upper": bb_upper, "bb_lower": bb_lower,
+        "rsi": rsi,
+        "price": current_price,
+    }
+
+
+def _window_dates(index, bar):
+    """
+    The start/end timestamps backtests score bars with: bar dates for daily or longer bars
+    (as backtest() passes dates to indicator()), bar timestamps for intraday bars.
+    """
+    index = pd.DatetimeIndex(index)
+    return index.normalize() if bar >= pd.Timedelta(days=1) else index
+
+
+def backtest_signals(df, window_size, timeframe="1d", reductions=None):
+    """
+    Computes the signal backtest() needs at every bar in one pass instead of calling indicator()
+    once per bar. Bar i is scored over the window from the date of bar i - window_size to the
+    date of bar i, using only rows up to i, exactly as backtest() calls indicator().
+    
+    Args:
+        df: DataFrame with 'close' column and a sorted datetime index
+        window_size: Number of bars each signal looks back
+        timeframe: Bar size of df, e.g. '5m', '1h', '1d' (default: '1d')
+        reductions: CumulativeTables(df["close"]) to reuse across many window sizes
+                    (default: None, exact reductions)
+    
+    Returns:
+        Tuple of (labels, strengths) numpy arrays, one entry per row of df. Rows before
+        window_size and windows too short to score are ("Hold", 0).
+    """
+    n = len(df)
+    labels = np.full(n, "Hold", dtype=object)
+    strengths = np.zeros(n, dtype=np.int64)
+    if n <= window_size:
+        return labels, strengths
+    bar = data.timeframeDelta(timeframe)
+    dates = _window_dates(df.index, bar)
+    positions = np.arange(window_size, n)
+    scores = _score_windows(df, dates[positions - window_size], dates[positions], positions + 1, bar, reductions)
+    strength = scores["strength"]
+    strengths[window_size:] = strength
+    labels[window_size:] = np.where(strength >= 1, "Buy", np.where(strength <= -1, "Sell", "Hold"))
+    return labels, strengths
+
+
+def indicator_series(stock_or_df, dates=None, start=None, lookback=None, asset_type="stock"):
+    """
+    Evaluates indicator() at many end dates in one call, sharing the rolling computations.
+    Each date d is scored as indicator(df, start, d) when start is given, or as
+    indicator(df, d - lookback, d) for a rolling window.
     
-    
\ No newline at end of file
+    Args:
+        stock_or_df: Stock symbol, crypto symbol, or DataFrame
+        dates: Evaluation (end) dates (default: every bar of the data)
+        start: Fixed start date for every window
+        lookback: Rolling window length, as days or a pandas Timedelta string like "90D"
+        asset_type: "stock" or "crypto" (default: "stock")
+    
+    Returns:
+        DataFrame indexed by evaluation date with columns signal, strength, ma0..ma4
+        (oldest window first), bb_mean, bb_upper, bb_lower, rsi and price. Components are NaN
+        where there is too little data to score (signal is then Hold).
+    """
+    if (start is None) == (lookback is None):
+        raise ValueError("Pass exactly one of start or lookback")
+    if isinstance(lookback, (int, np.integer)):
+        lookback = pd.Timedelta(days=int(lookback))
+    elif lookback is not None:
+        lookback = pd.Timedelta(lookback)
+
+    if isinstance(stock_or_df, pd.DataFrame):
+        df = stock_or_df
+    else:
+        if dates is None:
+            raise ValueError("dates are required when fetching by symbol")
+        first = pd.to_datetime(start) if start is not None else pd.to_datetime(min(dates)) - lookback
+        fetch_start, fetch_end = str(first.date()), str(pd.to_datetime(max(dates)).date())
+        symbol = stock_or_df
+        if asset_type == "crypto":
+            df = data.getCryptoData(symbol, start=fetch_start, end=fetch_end, columns=["close"])
+        else:
+            df = data.getData(symbol, start=fetch_start, end=fetch_end, columns=["close"])
+    df = df.set_axis(pd.to_datetime(df.index)).sort_index()
+
+    ends = pd.DatetimeIndex(pd.to_datetime(dates if dates is not None else df.index))
+    if start is not None:
+        starts = pd.DatetimeIndex(np.full(len(ends), pd.to_datetime(start).to_datetime64()))
+    else:
+        starts = ends - lookback
+    scores = _score_windows(df, starts, ends, np.full(len(ends), len(df)))
+
+    strength = scores["strength"]
+    valid = scores["valid"]
+    result = pd.DataFrame({
+        "signal": np.where(strength >= 1, "Buy", np.where(strength <= -1, "Sell", "Hold")),
+        "strength": strength,
+    }, index=ends)
+    for column in ["ma0", "ma1", "ma2", "ma3", "ma4", "bb_mean", "bb_upper", "bb_lower", "rsi", "price"]:
+        result[column] = np.where(valid, scores[column], np.nan)
+    return result
@@ -0,0 +1,162 @@
+# memoization for indicator results, keyed by the content of the price series
+import functools
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import metrics
+import store
+
+# Part of every key: bump it when a memoized computation changes, so old disk entries stop matching
+VERSION = 2
+
+ENABLED = os.getenv("TRADEBOT_MEMO", "1") != "0"
+MAXSIZE = int(os.getenv("TRADEBOT_MEMO_SIZE", "4096"))
+# Optional disk tier shared between processes and runs: off unless a directory is set
+DISK_DIR = os.getenv("TRADEBOT_MEMO_DIR") or None
+DISK_MAXSIZE = 100000
+
+_memory = OrderedDict()  # key -> result, least recently used first
+_lock = threading.Lock()
+_stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+_disk_writes = 0
+
+
+def configure(maxsize=None, disk_dir=None, disk_maxsize=None):
+    """Sets the in-memory entry limit, the disk tier directory and the disk entry limit."""
+    global MAXSIZE, DISK_DIR, DISK_MAXSIZE
+    if maxsize is not None:
+        MAXSIZE = maxsize
+        with _lock:
+            while len(_memory) > MAXSIZE:
+                _memory.popitem(last=False)
+    if disk_dir is not None:
+        DISK_DIR = disk_dir or None
+    if disk_maxsize is not None:
+        DISK_MAXSIZE = disk_maxsize
+
+
+def enable():
+    global ENABLED
+    ENABLED = True
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+
+def clear():
+    """Empties the in-memory tier and resets the statistics (the disk tier is kept)."""
+    with _lock:
+        _memory.clear()
+        for name in _stats:
+            _stats[name] = 0
+
+
+def stats():
+    """Returns hits (memory), disk_hits, misses, size and hit_rate (both tiers) since the last clear()."""
+    with _lock:
+        lookups = _stats["hits"] + _stats["disk_hits"] + _stats["misses"]
+        return {**_stats, "size": len(_memory),
+                "hit_rate": (_stats["hits"] + _stats["disk_hits"]) / lookups if lookups else 0.0}
+
+
+def fingerprint(df):
+    """
+    Content hash of a price frame: its timestamps and close prices. Appending, dropping or
+    changing a bar gives a new fingerprint, so cached results for the old series stop matching.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    close = df["close"].to_numpy()
+    digest.update(f"{len(df)}:{close.dtype}".encode())
+    digest.update(np.ascontiguousarray(pd.DatetimeIndex(df.index).as_unit("ns").asi8))
+    digest.update(np.ascontiguousarray(close))
+    return digest.hexdigest()
+
+
+def _disk_path(key):
+    return os.path.join(DISK_DIR, key[:2], f"{key}.pkl")
+
+
+def _disk_get(key):
+    try:
+        with open(_disk_path(key), "rb") as f:
+            return True, pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return False, None
+
+
+def _disk_put(key, value):
+    global _disk_writes
+    path = _disk_path(key)
+
+    def dump(tmp):
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    try:
+        store.atomic_write(path, dump)
+    except OSError:
+        return
+    _disk_writes += 1
+    if _disk_writes % 1000 == 0:
+        _disk_prune()
+
+
+def _disk_prune():
+    """Deletes the oldest disk entries beyond DISK_MAXSIZE."""
+    entries = []
+    for root, _, files in os.walk(DISK_DIR):
+        entries.extend(os.path.join(root, name) for name in files if name.endswith(".pkl"))
+    if len(entries) <= DISK_MAXSIZE:
+        return
+    entries.sort(key=lambda path: os.stat(path).st_mtime)
+    for path in entries[:len(entries) - DISK_MAXSIZE]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def memoize(func):
+    """
+    Caches func(df, *args, **kwargs) by the fingerprint of df, the other arguments and VERSION:
+    in memory with LRU eviction, and on disk when DISK_DIR is set. Results are shared between
+    callers, so they must not be modified.
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(df, *args, **kwargs):
+        if not ENABLED:
+            return func(df, *args, **kwargs)
+        params = repr((VERSION, name, args, sorted(kwargs.items())))
+        key = hashlib.blake2b(f"{fingerprint(df)}:{params}".encode(), digest_size=16).hexdigest()
+        with _lock:
+            if key in _memory:
+                _memory.move_to_end(key)
+                _stats["hits"] += 1
+                metrics.inc("memo_hits", tier="memory")
+                return _memory[key]
+        found, result = _disk_get(key) if DISK_DIR else (False, None)
+        if found:
+            with _lock:
+                _stats["disk_hits"] += 1
+            metrics.inc("memo_hits", tier="disk")
+        else:
+            with _lock:
+                _stats["misses"] += 1
+            metrics.inc("memo_misses")
+            result = func(df, *args, **kwargs)
+            if DISK_DIR:
+                _disk_put(key, result)
+        with _lock:
+            _memory[key] = result
+            while len(_memory) > MAXSIZE:
+                _memory.popitem(last=False)
+        return result
+
+    return wrapper
@@ -0,0 +1,140 @@
+# opt-in counters and timers for the data, indicator and backtest hot paths
+import os
+import time
+
+# Off unless TRADEBOT_METRICS=1 or enable() is called; when off every hook returns immediately
+ENABLED = os.getenv("TRADEBOT_METRICS") == "1"
+
+_counters = {}  # (name, labels) -> value
+_timers = {}    # (name, labels) -> [count, total seconds, max seconds]
+
+
+def enable():
+    global ENABLED
+    ENABLED = True
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+
+def reset():
+    """Clears every counter and timer."""
+    _counters.clear()
+    _timers.clear()
+
+
+def inc(name, value=1, **labels):
+    """Adds value to a counter, e.g. inc("fetch_requests", exchange="binance")."""
+    if not ENABLED:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, seconds, **labels):
+    """Records one timing of 'seconds' for a timer."""
+    if not ENABLED:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    stats = _timers.get(key)
+    if stats is None:
+        _timers[key] = [1, seconds, seconds]
+    else:
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] = max(stats[2], seconds)
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "t0")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.t0, **self.labels)
+        return False
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopTimer()
+
+
+def timer(name, **labels):
+    """Context manager timing its block, e.g. with timer("store_read", format="npy"): ..."""
+    if not ENABLED:
+        return _NOOP
+    return _Timer(name, labels)
+
+
+def _label_text(labels):
+    return ",".join(f"{k}={v}" for k, v in labels)
+
+
+def summary():
+    """
+    Returns all metrics as a dict: counters, timers (count, total, mean and max seconds) and
+    derived rates such as backtest bars per second.
+    """
+    counters = {}
+    for (name, labels), value in sorted(_counters.items()):
+        counters[f"{name}{{{_label_text(labels)}}}" if labels else name] = value
+    timers = {}
+    for (name, labels), (count, total, worst) in sorted(_timers.items()):
+        timers[f"{name}{{{_label_text(labels)}}}" if labels else name] = {
+            "count": count, "total": total, "mean": total / count, "max": worst}
+    derived = {}
+    bars = sum(v for (name, _), v in _counters.items() if name == "backtest_bars")
+    loop_time = sum(s[1] for (name, _), s in _timers.items() if name == "backtest_loop")
+    if bars and loop_time:
+        derived["backtest_bars_per_second"] = bars / loop_time
+    hits = sum(v for (name, _), v in _counters.items() if name == "store_hits")
+    misses = sum(v for (name, _), v in _counters.items() if name == "store_misses")
+    if hits + misses:
+        derived["store_hit_rate"] = hits / (hits + misses)
+    memo_hits = sum(v for (name, _), v in _counters.items() if name == "memo_hits")
+    memo_misses = sum(v for (name, _), v in _counters.items() if name == "memo_misses")
+    if memo_hits + memo_misses:
+        derived["memo_hit_rate"] = memo_hits / (memo_hits + memo_misses)
+    return {"counters": counters, "timers": timers, "derived": derived}
+
+
+def prometheus(prefix="tradebot"):
+    """Returns all metrics in the Prometheus text exposition format."""
+    def labels_text(labels):
+        if not labels:
+            return ""
+        return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+    lines = []
+    seen = set()
+    for (name, labels), value in sorted(_counters.items()):
+        metric = f"{prefix}_{name}_total"
+        if metric not in seen:
+            lines.append(f"# TYPE {metric} counter")
+            seen.add(metric)
+        lines.append(f"{metric}{labels_text(labels)} {value}")
+    for (name, labels), (count, total, _) in sorted(_timers.items()):
+        metric = f"{prefix}_{name}_seconds"
+        if metric not in seen:
+            lines.append(f"# TYPE {metric} summary")
+            seen.add(metric)
+        lines.append(f"{metric}_count{labels_text(labels)} {count}")
+        lines.append(f"{metric}_sum{labels_text(labels)} {total}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,212 @@
+# Monte Carlo robustness tests: backtest thousands of bootstrapped price paths at once
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import data
+from indicator import _score_ranges, _window_dates, CumulativeTables
+
+
+def bootstrap_paths(closes, n_paths, method="block", block_size=20, rng=None):
+    """
+    Resamples the bar-to-bar log returns of a close series into n_paths new price paths
+    starting at the same first price. method "iid" draws every return independently; "block"
+    draws runs of block_size consecutive returns, keeping short-range structure such as
+    volatility clustering. Returns a (n_paths, len(closes)) float64 array.
+    """
+    closes = np.asarray(closes, dtype=float)
+    rng = rng if rng is not None else np.random.default_rng()
+    returns = np.diff(np.log(closes))
+    n = len(returns)
+    if method == "iid":
+        picks = rng.integers(0, n, size=(n_paths, n))
+    elif method == "block":
+        block_size = max(1, min(block_size, n))
+        blocks = -(-n // block_size)
+        starts = rng.integers(0, n - block_size + 1, size=(n_paths, blocks))
+        picks = (starts[:, :, None] + np.arange(block_size)).reshape(n_paths, -1)[:, :n]
+    else:
+        raise ValueError(f"Unknown bootstrap method: {method}")
+    paths = np.empty((n_paths, len(closes)))
+    paths[:, 0] = closes[0]
+    paths[:, 1:] = closes[0] * np.exp(np.cumsum(returns[picks], axis=1))
+    return paths
+
+
+def path_signals(paths, index, window_size, timeframe="1d"):
+    """
+    backtest_signals() for many price paths sharing one calendar: the signal strength of every
+    bar of every path, as a (paths, bars) int64 array, from one set of cumulative tables.
+    """
+    n = paths.shape[1]
+    strengths = np.zeros(paths.shape, dtype=np.int64)
+    if n <= window_size:
+        return strengths
+    index = pd.DatetimeIndex(index)
+    bar = data.timeframeDelta(timeframe)
+    dates = _window_dates(index, bar)
+    positions = np.arange(window_size, n)
+    starts, ends = dates[positions - window_size], dates[positions]
+
+    def bars_through(timestamps):
+        return index.searchsorted(timestamps, side="right")
+
+    lo = index.searchsorted(starts, side="left")
+    hi = np.minimum(bars_through(ends), positions + 1)
+    scores = _score_ranges(paths, starts, ends, lo, hi, bars_through, bar, CumulativeTables(paths))
+    strengths[:, window_size:] = scores["strength"]
+    return strengths
+
+
+def simulate_paths(paths, window_size, strengths, initial_investment=10000, asset_type="stock",
+                   stop_loss_pct=0.05, take_profit_pct=0.15, max_signal_strength=3):
+    """
+    backtest.simulate() (average-cost accounting) run on every path at once: one step per bar
+    over arrays holding each path's cash, quantity and cost. Only the running peak and
+    drawdown are kept, not the equity curves.
+
+    Returns:
+        Dict of arrays with one entry per path: gain, final_value, max_drawdown, buys and sells
+    """
+    n_paths, n = paths.shape
+    cash = np.full(n_paths, float(initial_investment))
+    quantity = np.zeros(n_paths)
+    cost = np.zeros(n_paths)
+    buys = np.zeros(n_paths, dtype=np.int64)
+    sells = np.zeros(n_paths, dtype=np.int64)
+    value = cash.copy()
+    peak = np.zeros(n_paths)
+    drawdown = np.zeros(n_paths)
+
+    def sell(mask, shares, price):
+        # Position.sell(): selling everything closes the position, otherwise cost shrinks in proportion
+        nonlocal cash, quantity, cost
+        shares = np.where(mask, np.minimum(shares, quantity), 0.0)
+        cash = cash + np.where(mask, shares * price, 0.0)
+        closing = mask & (shares >= quantity)
+        partial = mask & ~closing
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cost = np.where(partial, cost - cost * (shares / quantity), np.where(closing, 0.0, cost))
+        quantity = np.where(partial, quantity - shares, np.where(closing, 0.0, quantity))
+
+    for i in range(window_size, n):
+        price = paths[:, i]
+
+        # Stop loss (sell everything) and take profit (sell half) on open positions
+        held = quantity > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            avg_entry_price = np.where(held, cost / quantity, 0.0)
+            price_change = (price - avg_entry_price) / avg_entry_price
+        stop = held & (price_change <= -stop_loss_pct)
+        take = held & ~stop & (price_change >= take_profit_pct)
+        sell(stop, quantity, price)
+        sell(take, quantity * 0.5, price)
+        sells += stop | take
+
+        # Signal trades, sized by strength
+        strength = strengths[:, i]
+        fraction = np.minimum(1.0, np.abs(strength) / max_signal_strength)
+        buying = (strength >= 1) & (cash > 0)
+        cash_to_invest = cash * fraction
+        if asset_type == "crypto":
+            shares = cash_to_invest / price
+            buying &= shares > 0
+            spent = cash_to_invest
+        else:
+            buying &= cash_to_invest >= price
+            shares = np.floor_divide(cash_to_invest, price)
+            buying &= shares > 0
+            spent = shares * price
+        cash = np.where(buying, cash - spent, cash)
+        quantity = np.where(buying, quantity + shares, quantity)
+        cost = np.where(buying, cost + shares * price, cost)
+        buys += buying
+
+        selling = (strength <= -1) & (quantity > 0)
+        sell(selling, quantity * fraction, price)
+        sells += selling
+
+        value = cash + quantity * price
+        peak = np.maximum(peak, value)
+        drawdown = np.maximum(drawdown, (peak - value) / peak)
+
+    return {
+        "gain": (value - initial_investment) / initial_investment * 100,
+        "final_value": value,
+        "max_drawdown": drawdown * 100,
+        "buys": buys,
+        "sells": sells,
+    }
+
+
+def _run_batch(task):
+    """Bootstraps, scores and simulates one batch of paths."""
+    closes, index, n_paths, seed, method, block_size, window_size, timeframe, kwargs = task
+    paths = bootstrap_paths(closes, n_paths, method, block_size, np.random.default_rng(seed))
+    strengths = path_signals(paths, index, window_size, timeframe)
+    return simulate_paths(paths, window_size, strengths, **kwargs)
+
+
+def monte_carlo(symbol_or_df, start, end, n_paths=10000, method="block", block_size=20, seed=None,
+                initial_investment=10000, asset_type="stock", stop_loss_pct=0.05, take_profit_pct=0.15,
+                max_signal_strength=3, timeframe="1d", batch_size=500, max_workers=None):
+    """
+    Monte Carlo robustness test of the backtest strategy.
+
+    Builds n_paths price paths by bootstrapping the symbol's historical returns (on its real
+    calendar) and runs the signal and position logic of backtest(vectorized=True) on all of
+    them with 2-D arrays, batch_size paths at a time, with the batches spread over a process
+    pool. Results are reproducible for a given seed, whatever the number of workers.
+
+    Args:
+        symbol_or_df: Symbol to fetch, or a DataFrame with a 'close' column and datetime index
+        start: Start date in 'YYYY-MM-DD' format
+        end: End date in 'YYYY-MM-DD' format
+        n_paths: Number of resampled paths (default: 10000)
+        method: "block" (runs of block_size returns) or "iid" (default: "block")
+        block_size: Returns per block for the block bootstrap (default: 20)
+        seed: Random seed (default: None, a fresh one)
+        initial_investment, asset_type, stop_loss_pct, take_profit_pct, max_signal_strength,
+        timeframe: As in backtest()
+        batch_size: Paths scored together in one set of arrays (default: 500)
+        max_workers: Worker processes (default: one per CPU; 1 runs in this process)
+
+    Returns:
+        Dict with paths (DataFrame, one row per path: gain, final_value, max_drawdown, buys,
+        sells and trades), summary (their mean, standard deviation and percentiles) and
+        historical (the same figures for the unresampled history)
+    """
+    if isinstance(symbol_or_df, pd.DataFrame):
+        df = symbol_or_df[["close"]]
+    elif asset_type == "crypto":
+        df = data.getCryptoData(symbol_or_df, start=start, end=end, columns=["close"], timeframe=timeframe)
+    else:
+        df = data.getData(symbol_or_df, start=start, end=end, columns=["close"], timeframe=timeframe)
+    df = df.set_axis(pd.to_datetime(df.index)).sort_index()
+    closes = df["close"].to_numpy(dtype=float)
+    total_bars = (pd.to_datetime(end) - pd.to_datetime(start)) // data.timeframeDelta(timeframe)
+    window_size = max(1, total_bars // 5)
+    if len(closes) < max(window_size, 2):
+        raise ValueError("Not enough data to run a Monte Carlo backtest")
+    kwargs = {"initial_investment": initial_investment, "asset_type": asset_type, "stop_loss_pct": stop_loss_pct,
+              "take_profit_pct": take_profit_pct, "max_signal_strength": max_signal_strength}
+
+    sizes = [min(batch_size, n_paths - first) for first in range(0, n_paths, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(closes, df.index, size, batch_seed, method, block_size, window_size, timeframe, kwargs)
+             for size, batch_seed in zip(sizes, seeds)]
+    workers = min(max_workers or os.cpu_count(), len(tasks))
+    if workers <= 1:
+        batches = [_run_batch(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            batches = list(pool.map(_run_batch, tasks))
+
+    paths = pd.DataFrame({name: np.concatenate([batch[name] for batch in batches]) for name in batches[0]})
+    paths["trades"] = paths["buys"] + paths["sells"]
+    history = closes[None, :]
+    historical = simulate_paths(history, window_size, path_signals(history, df.index, window_size, timeframe), **kwargs)
+    historical = {name: values[0].item() for name, values in historical.items()}
+    historical["trades"] = historical["buys"] + historical["sells"]
+    summary = paths[["gain", "max_drawdown", "trades"]].describe(percentiles=[0.05, 0.25, 0.5, 0.75, 0.95]).T
+    return {"paths": paths, "summary": summary, "historical": historical}
@@ -0,0 +1,146 @@
+# portfolio backtests: many symbols on one timeline sharing a single cash balance
+import numpy as np
+import pandas as pd
+from indicator import backtest_signals
+from backtest import max_drawdown
+from screener import price_panel
+
+
+def panel_signals(panel, window_size):
+    """
+    Signal strengths for every (date, symbol) of a price panel, each symbol scored on its own
+    bars exactly as a single-symbol backtest would score it. Dates where a symbol has no bar,
+    or that are still inside its first window, are 0.
+    """
+    strengths = np.zeros(panel.shape, dtype=np.int64)
+    for j, symbol in enumerate(panel.columns):
+        closes = panel[symbol].dropna()
+        if len(closes) <= window_size:
+            continue
+        _, symbol_strengths = backtest_signals(closes.to_frame("close"), window_size)
+        rows = panel.index.get_indexer(closes.index)
+        strengths[rows, j] = symbol_strengths
+    return strengths
+
+
+def portfolio_backtest(symbols_or_panel, start, end, initial_investment=10000, asset_type="stock",
+                       stop_loss_pct=0.05, take_profit_pct=0.15, max_signal_strength=3):
+    """
+    Backtests the strategy on many symbols at once with one shared cash balance.
+
+    The timeline is the union of all symbols' dates. On each date, for every symbol with a bar:
+    stop loss / take profit are checked against its average entry price, then Sell signals are
+    executed, then Buy signals split the available cash evenly and each invests
+    strength / max_signal_strength of its share (the single-symbol sizing rule). Positions live
+    in NumPy arrays, so a step costs a handful of array operations however many symbols there are.
+
+    Args:
+        symbols_or_panel: List of symbols to fetch, or a DataFrame panel (dates x symbols of closes)
+        start: Start date in 'YYYY-MM-DD' format
+        end: End date in 'YYYY-MM-DD' format
+        initial_investment: Starting capital shared by all symbols (default: 10000)
+        asset_type: "stock" (whole shares) or "crypto" (fractional) (default: "stock")
+        stop_loss_pct: Stop loss as a fraction of the average entry price (default: 0.05)
+        take_profit_pct: Take profit as a fraction of the average entry price (default: 0.15)
+        max_signal_strength: Signal strength that invests/sells 100% (default: 3)
+
+    Returns:
+        Dict with gain, final_value, cash, max_drawdown, portfolio_value (equity curve array),
+        dates, and positions (DataFrame per symbol: shares, avg_entry_price, value, buys, sells)
+    """
+    if isinstance(symbols_or_panel, pd.DataFrame):
+        panel = symbols_or_panel
+    else:
+        panel = price_panel(symbols_or_panel, start, end, asset_type)
+    panel = panel.set_axis(pd.to_datetime(panel.index)).sort_index()
+    panel = panel[(panel.index >= pd.to_datetime(start)) & (panel.index < pd.to_datetime(end) + pd.Timedelta(days=1))]
+    panel = panel.astype(float)
+
+    total_days = (pd.to_datetime(end) - pd.to_datetime(start)).days
+    window_size = max(1, total_days // 5)
+    strengths = panel_signals(panel, window_size)
+    prices = panel.to_numpy()
+    last_prices = panel.ffill().to_numpy()  # valuation for symbols without a bar on a date
+
+    n_dates, n_symbols = prices.shape
+    cash = float(initial_investment)
+    quantity = np.zeros(n_symbols)
+    cost = np.zeros(n_symbols)
+    buys = np.zeros(n_symbols, dtype=np.int64)
+    sells = np.zeros(n_symbols, dtype=np.int64)
+    portfolio_value = np.empty(n_dates)
+
+    for t in range(n_dates):
+        price = prices[t]
+        has_bar = ~np.isnan(price)
+        held = has_bar & (quantity > 0)
+
+        # Stop loss / take profit per symbol
+        if held.any():
+            avg_entry = np.divide(cost, quantity, out=np.zeros(n_symbols), where=held)
+            change = np.divide(price - avg_entry, avg_entry, out=np.zeros(n_symbols), where=held)
+            stop = held & (change <= -stop_loss_pct)
+            take = held & ~stop & (change >= take_profit_pct)
+            if stop.any():
+                cash += np.sum(quantity[stop] * price[stop])
+                quantity[stop] = 0
+                cost[stop] = 0
+                sells[stop] += 1
+            if take.any():
+                # Sell 50% to lock in profits, keep 50% for further gains
+                cash += np.sum(quantity[take] * 0.5 * price[take])
+                quantity[take] *= 0.5
+                cost[take] *= 0.5
+                sells[take] += 1
+
+        signal = strengths[t]
+        fraction = np.minimum(1.0, np.abs(signal) / max_signal_strength)
+
+        # Sell signals: sell the same fraction of the position
+        selling = has_bar & (signal <= -1) & (quantity > 0)
+        if selling.any():
+            sold = quantity[selling] * fraction[selling]
+            cash += np.sum(sold * price[selling])
+            cost[selling] *= 1 - fraction[selling]
+            quantity[selling] -= sold
+            sells[selling] += 1
+
+        # Buy signals share the cash evenly, each investing its strength fraction of its share
+        buying = has_bar & (signal >= 1)
+        if buying.any() and cash > 0:
+            to_invest = cash / np.count_nonzero(buying) * fraction[buying]
+            if asset_type == "crypto":
+                bought = to_invest / price[buying]
+                spent = to_invest
+            else:
+                bought = np.floor(to_invest / price[buying])
+                spent = bought * price[buying]
+            cash -= np.sum(spent)
+            quantity[buying] += bought
+            cost[buying] += spent
+            buys[buying] += bought > 0
+
+        portfolio_value[t] = cash + np.nansum(quantity * last_prices[t])
+
+    final_value = portfolio_value[-1] if n_dates else float(initial_investment)
+    final_prices = last_prices[-1] if n_dates else np.zeros(n_symbols)
+    positions = pd.DataFrame({
+        "shares": quantity,
+        "avg_entry_price": np.divide(cost, quantity, out=np.zeros(n_symbols), where=quantity > 0),
+        "value": np.nan_to_num(quantity * final_prices),
+        "buys": buys,
+        "sells": sells,
+    }, index=pd.Index(panel.columns, name="symbol"))
+    return {
+        "symbol": f"Portfolio of {n_symbols}",
+        "start": start,
+        "end": end,
+        "asset_type": asset_type,
+        "gain": ((final_value - initial_investment) / initial_investment) * 100,
+        "final_value": final_value,
+        "cash": cash,
+        "max_drawdown": max_drawdown(portfolio_value),
+        "portfolio_value": portfolio_value,
+        "dates": panel.index,
+        "positions": positions,
+    }
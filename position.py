@@ -0,0 +1,83 @@
+# position accounting for backtests: quantity and cost basis, updated in O(1) per fill
+import numpy as np
+
+
+class Position:
+    """
+    Tracks the quantity held and its cost basis, for fractional (crypto) and whole-share
+    (stock) positions alike.
+
+    By default sells use average-cost accounting: they reduce quantity and cost in proportion,
+    so the average entry price is unchanged. With fifo=True every buy is kept as a lot in
+    a pair of NumPy arrays and sells consume the oldest lots first, so the average entry
+    price is that of the lots still held.
+    """
+
+    def __init__(self, fifo=False):
+        self.quantity = 0.0
+        self.cost = 0.0
+        self.fifo = fifo
+        if fifo:
+            self._lot_qty = np.empty(16)
+            self._lot_price = np.empty(16)
+            self._head = 0  # first open lot
+            self._tail = 0  # one past the last lot
+
+    @property
+    def avg_price(self):
+        """Average entry price of the open position (0 when flat)."""
+        return self.cost / self.quantity if self.quantity > 0 else 0.0
+
+    def buy(self, quantity, price):
+        """Adds quantity bought at price."""
+        self.quantity += quantity
+        self.cost += quantity * price
+        if self.fifo:
+            if self._tail == len(self._lot_qty):
+                self._grow()
+            self._lot_qty[self._tail] = quantity
+            self._lot_price[self._tail] = price
+            self._tail += 1
+
+    def sell(self, quantity):
+        """Removes quantity from the position and returns the cost basis that was sold."""
+        quantity = min(quantity, self.quantity)
+        if quantity >= self.quantity:
+            return self.close()
+        if self.fifo:
+            removed = 0.0
+            remaining = quantity
+            while remaining > 0 and self._head < self._tail:
+                lot = self._lot_qty[self._head]
+                take = min(lot, remaining)
+                removed += take * self._lot_price[self._head]
+                remaining -= take
+                if take == lot:
+                    self._head += 1
+                else:
+                    self._lot_qty[self._head] = lot - take
+        else:
+            removed = self.cost * (quantity / self.quantity)
+        self.quantity -= quantity
+        self.cost -= removed
+        return removed
+
+    def close(self):
+        """Empties the position and returns the cost basis that was sold."""
+        removed = self.cost
+        self.quantity = 0.0
+        self.cost = 0.0
+        if self.fifo:
+            self._head = self._tail = 0
+        return removed
+
+    def _grow(self):
+        """Drops consumed lots and doubles the lot arrays if they are still more than half full."""
+        open_lots = self._tail - self._head
+        size = len(self._lot_qty) * 2 if open_lots > len(self._lot_qty) // 2 else len(self._lot_qty)
+        lot_qty = np.empty(size)
+        lot_price = np.empty(size)
+        lot_qty[:open_lots] = self._lot_qty[self._head:self._tail]
+        lot_price[:open_lots] = self._lot_price[self._head:self._tail]
+        self._lot_qty, self._lot_price = lot_qty, lot_price
+        self._head, self._tail = 0, open_lots
@@ -0,0 +1,118 @@
+# shared price cache: bars loaded once into memory-mapped files, read zero-copy by every worker process
+import json
+import os
+import shutil
+import tempfile
+import data
+import store
+
+# RAM-backed on Linux; elsewhere the OS page cache keeps the files in memory once read
+SHARED_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+class PriceCache:
+    """
+    Registry of price series shared between processes.
+
+    The process that builds the cache writes each symbol's bars once, in the store's npy layout
+    (one memory-mappable .npy file per column plus the index), to a directory in shared memory.
+    Worker processes attach() to it by its handle (the directory path, cheap to pickle) and get
+    read-only DataFrames wrapping the mapped arrays: the bars are never parsed or copied per
+    worker, so adding workers doesn't add copies of the prices.
+
+        with PriceCache() as cache:
+            cache.load(symbols, "2020-01-01", "2024-12-31", columns=["close"])
+            with ProcessPoolExecutor(initializer=init, initargs=(cache.handle,)) as pool: ...
+
+        def init(handle):
+            global prices
+            prices = pricecache.attach(handle)   # prices.get("AAPL") -> read-only DataFrame
+    """
+
+    def __init__(self, directory=None, _owner=True):
+        self.directory = directory or tempfile.mkdtemp(prefix="tradebot-prices-", dir=SHARED_DIR)
+        self._owner = _owner
+        self._frames = {}  # symbol -> DataFrame over the mapped arrays, opened once per process
+
+    @property
+    def handle(self):
+        """What workers pass to attach(): the cache directory."""
+        return self.directory
+
+    def _registry(self):
+        try:
+            with open(os.path.join(self.directory, "registry.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def put(self, symbol, df):
+        """Writes a symbol's bars (a DataFrame with a datetime index) into the cache, replacing earlier ones."""
+        registry = self._registry()
+        name = registry.get(symbol) or f"{len(registry)}_{symbol.replace('/', '_')}"
+        store.write_frame(os.path.join(self.directory, name), df)
+        registry[symbol] = name
+
+        def write_registry(tmp):
+            with open(tmp, "w") as f:
+                json.dump(registry, f)
+        store.atomic_write(os.path.join(self.directory, "registry.json"), write_registry)
+        self._frames.pop(symbol, None)
+
+    def load(self, symbols, start, end, asset_type="stock", columns=None, timeframe="1d"):
+        """
+        Fetches symbols through the data layer (store first) and puts them in the cache.
+        Returns the symbols that could not be fetched.
+        """
+        failed = []
+        for symbol in symbols:
+            try:
+                if asset_type == "crypto":
+                    df = data.getCryptoData(symbol, start=start, end=end, columns=columns, timeframe=timeframe)
+                else:
+                    df = data.getData(symbol, start=start, end=end, columns=columns, timeframe=timeframe)
+            except ValueError as e:
+                print(f"{symbol}: error getting data ({e})")
+                failed.append(symbol)
+                continue
+            self.put(symbol, df)
+        return failed
+
+    def symbols(self):
+        return list(self._registry())
+
+    def get(self, symbol):
+        """Returns a symbol's bars as a read-only DataFrame over the shared arrays (no copy)."""
+        frame = self._frames.get(symbol)
+        if frame is None:
+            registry = self._registry()
+            if symbol not in registry:
+                raise KeyError(f"{symbol} is not in the price cache")
+            frame = store.read_frame(os.path.join(self.directory, registry[symbol]))
+            self._frames[symbol] = frame
+        return frame
+
+    def arrays(self, symbol):
+        """Returns a symbol's columns and index ('index', as datetime64[ns]) as read-only NumPy views."""
+        frame = self.get(symbol)
+        arrays = {col: frame[col].to_numpy() for col in frame.columns}
+        arrays["index"] = frame.index.to_numpy()
+        return arrays
+
+    def close(self):
+        """Drops this process's views; the process that created the cache also deletes it."""
+        self._frames.clear()
+        if self._owner:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def attach(handle):
+    """Opens the PriceCache created elsewhere with this handle (read-only use; close() keeps it)."""
+    return PriceCache(handle, _owner=False)
@@ -0,0 +1,181 @@
+# persistent backtest results: one SQLite row per run, deduplicated by parameters and data fingerprint
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+import numpy as np
+import pandas as pd
+import memo
+import store
+
+# Part of every run key: bump it when the backtest logic changes, so stored runs stop matching
+VERSION = 1
+
+# On unless TRADEBOT_RESULTS=0; the database lives in the store directory unless TRADEBOT_RESULTS_DB is set
+ENABLED = os.getenv("TRADEBOT_RESULTS", "1") != "0"
+DB_PATH = os.getenv("TRADEBOT_RESULTS_DB") or None
+
+# Parameters that identify a run, besides the data fingerprint
+TEXT_PARAMS = ["symbol", "start", "end", "asset_type", "timeframe"]
+PARAMS = TEXT_PARAMS + ["initial_investment", "stop_loss_pct", "take_profit_pct", "max_signal_strength", "fifo"]
+# Summary columns stored (and queryable) for every run
+SUMMARY = ["gain", "final_value", "max_drawdown", "buys", "sells", "window_size", "last_price",
+           "cash", "shares", "avg_entry_price"]
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    run_key TEXT NOT NULL UNIQUE,
+    fingerprint TEXT NOT NULL,
+    created REAL NOT NULL,
+    {", ".join(f'"{name}" {"TEXT" if name in TEXT_PARAMS else "NUMERIC"}' for name in PARAMS + SUMMARY)},
+    dates BLOB,
+    portfolio_value BLOB,
+    trades TEXT,
+    signals_generated TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_symbol_range ON runs (symbol, start, "end");
+CREATE INDEX IF NOT EXISTS runs_params ON runs (stop_loss_pct, take_profit_pct, max_signal_strength);
+CREATE INDEX IF NOT EXISTS runs_gain ON runs (gain);
+"""
+
+
+def enable():
+    global ENABLED
+    ENABLED = True
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+
+def _path():
+    return DB_PATH or os.path.join(store.STORE_DIR, "results.db")
+
+
+def _connect():
+    path = _path()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def run_key(params, fingerprint):
+    """Identity of a run: its parameters, the fingerprint of its price data and VERSION."""
+    values = [str(params[name]) if name in TEXT_PARAMS else float(params[name]) for name in PARAMS]
+    text = json.dumps([VERSION, fingerprint, values])
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def _params(params):
+    return {name: str(params[name]) if name in TEXT_PARAMS else params[name] for name in PARAMS}
+
+
+def _columns(names):
+    return ", ".join(f'"{name}"' for name in names)
+
+
+def lookup(params, df):
+    """Returns the stored result of the run with these parameters on this data, or None."""
+    key = run_key(_params(params), memo.fingerprint(df))
+    with closing(_connect()) as conn:
+        conn.row_factory = sqlite3.Row
+        row = conn.execute("SELECT * FROM runs WHERE run_key = ?", (key,)).fetchone()
+    return _result(row) if row is not None else None
+
+
+def save(params, df, result):
+    """Stores a backtest result (replacing an identical earlier run) and returns its run id."""
+    fingerprint = memo.fingerprint(df)
+    row = {
+        "run_key": run_key(_params(params), fingerprint),
+        "fingerprint": fingerprint,
+        "created": time.time(),
+        **_params(params),
+        **{name: result[name] for name in SUMMARY if name in result},
+        "buys": result["trades_executed"]["Buy"],
+        "sells": result["trades_executed"]["Sell"],
+        "dates": np.ascontiguousarray(pd.DatetimeIndex(result["dates"]).as_unit("ns").asi8).tobytes(),
+        "portfolio_value": np.asarray(result["portfolio_value"], dtype=np.float64).tobytes(),
+        "trades": json.dumps(result["trades"], default=float),
+        "signals_generated": json.dumps(result["signals_generated"]),
+    }
+    row = {name: value.item() if isinstance(value, np.generic) else value for name, value in row.items()}
+    columns = _columns(row)
+    with closing(_connect()) as conn, conn:
+        cursor = conn.execute(f"INSERT OR REPLACE INTO runs ({columns}) VALUES ({', '.join('?' * len(row))})",
+                              list(row.values()))
+        return cursor.lastrowid
+
+
+def _result(row):
+    """Rebuilds the dict backtest() returns from a stored row."""
+    result = {name: row[name] for name in TEXT_PARAMS + SUMMARY}
+    result["window_size"] = int(result["window_size"])
+    result["dates"] = pd.DatetimeIndex(np.frombuffer(row["dates"], dtype=np.int64).astype("datetime64[ns]"))
+    result["portfolio_value"] = np.frombuffer(row["portfolio_value"], dtype=np.float64).copy()
+    result["trades"] = json.loads(row["trades"])
+    result["signals_generated"] = json.loads(row["signals_generated"])
+    result["trades_executed"] = {"Buy": int(row["buys"]), "Sell": int(row["sells"])}
+    del result["buys"], result["sells"]
+    result["run_id"] = row["id"]
+    return result
+
+
+def load(run_id):
+    """Returns the full stored result (equity curve and trade log included) of one run."""
+    with closing(_connect()) as conn:
+        conn.row_factory = sqlite3.Row
+        row = conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+    if row is None:
+        raise KeyError(f"No stored run {run_id}")
+    return _result(row)
+
+
+def query(symbol=None, start=None, end=None, order_by="created", limit=None, **params):
+    """
+    Summaries of stored runs as a DataFrame (one row per run, without equity curves), filtered
+    by symbol, by date range (runs starting on or after start and ending on or before end) and
+    by exact parameter values, e.g. query("AAPL", stop_loss_pct=0.05, order_by="gain DESC").
+    """
+    unknown = set(params) - set(PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown run parameters: {sorted(unknown)}")
+    where, values = [], []
+    if symbol is not None:
+        where.append("symbol = ?")
+        values.append(symbol)
+    if start is not None:
+        where.append("start >= ?")
+        values.append(str(start))
+    if end is not None:
+        where.append('"end" <= ?')
+        values.append(str(end))
+    for name, value in params.items():
+        where.append(f'"{name}" = ?')
+        values.append(value)
+    order_name, _, direction = order_by.partition(" ")
+    if order_name not in ["id", "created"] + PARAMS + SUMMARY or direction.upper() not in ("", "ASC", "DESC"):
+        raise ValueError(f"Cannot order by {order_by!r}")
+    sql = (f"SELECT id, created, fingerprint, {_columns(PARAMS + SUMMARY)} FROM runs"
+           + (f" WHERE {' AND '.join(where)}" if where else "")
+           + f' ORDER BY "{order_name}" {direction}'
+           + (" LIMIT ?" if limit is not None else ""))
+    if limit is not None:
+        values.append(int(limit))
+    with closing(_connect()) as conn:
+        runs = pd.read_sql_query(sql, conn, params=values)
+    runs["created"] = pd.to_datetime(runs["created"], unit="s")
+    runs["fifo"] = runs["fifo"].astype(bool)
+    return runs.set_index("id")
+
+
+def clear():
+    """Deletes every stored run."""
+    with closing(_connect()) as conn, conn:
+        conn.execute("DELETE FROM runs")
@@ -0,0 +1,81 @@
+# cross-sectional screener: score many symbols at once from one dates x symbols price panel
+import numpy as np
+import pandas as pd
+import data
+from indicator import _score_ranges
+
+
+def price_panel(symbols, start, end, asset_type="stock"):
+    """
+    Fetches closes for many symbols and aligns them into one panel (dates x symbols).
+    Dates where a symbol has no bar are NaN. Crypto symbols are downloaded concurrently.
+    """
+    if asset_type == "crypto":
+        frames = data.getCryptoDataBatch(symbols, start=start, end=end, columns=["close"])
+    else:
+        frames = {}
+        for symbol in symbols:
+            try:
+                frames[symbol] = data.getData(symbol, start=start, end=end, columns=["close"])
+            except ValueError as e:
+                print(f"{symbol}: error getting data ({e})")
+    columns = {symbol: df["close"].astype(float) for symbol, df in frames.items()}
+    return pd.DataFrame(columns).sort_index()
+
+
+def screen(symbols_or_panel, start, end, asset_type="stock"):
+    """
+    Scores every symbol of a price panel at 'end', as indicator(symbol, start, end) would,
+    with all columns computed together.
+
+    Args:
+        symbols_or_panel: List of symbols to fetch, or a DataFrame panel (dates x symbols of closes)
+        start: Start date in 'YYYY-MM-DD' format
+        end: End date in 'YYYY-MM-DD' format
+        asset_type: "stock" or "crypto" (default: "stock")
+
+    Returns:
+        DataFrame indexed by symbol, ranked strongest Buy first, with columns rank, signal,
+        strength, ma0..ma4, bb_mean, bb_upper, bb_lower, rsi and price
+    """
+    if isinstance(symbols_or_panel, pd.DataFrame):
+        panel = symbols_or_panel
+    else:
+        panel = price_panel(symbols_or_panel, start, end, asset_type)
+    panel = panel.set_axis(pd.to_datetime(panel.index)).sort_index()
+    symbols = list(panel.columns)
+    dates = pd.DatetimeIndex(panel.index)
+    values = panel.to_numpy(dtype=float)
+    has_bar = ~np.isnan(values)
+
+    # Each symbol's own bars, laid end to end: symbol j occupies close[offsets[j]:offsets[j + 1]]
+    close = values.T[has_bar.T]
+    bar_counts = has_bar.sum(axis=0)
+    offsets = np.concatenate(([0], np.cumsum(bar_counts)[:-1]))
+    # bars_before[r, j] = number of bars symbol j has in the first r rows of the panel
+    bars_before = np.vstack([np.zeros((1, len(symbols)), dtype=np.int64), np.cumsum(has_bar, axis=0)])
+    columns = np.arange(len(symbols))
+
+    def bars_through(timestamps):
+        rows = dates.searchsorted(timestamps, side="right")
+        return offsets + bars_before[rows, columns]
+
+    start = pd.to_datetime(start)
+    end = pd.to_datetime(end)
+    starts = pd.DatetimeIndex(np.full(len(symbols), start.to_datetime64()))
+    ends = pd.DatetimeIndex(np.full(len(symbols), end.to_datetime64()))
+    lo = offsets + bars_before[dates.searchsorted(start, side="left"), columns]
+    hi = bars_through(ends)
+    scores = _score_ranges(close, starts, ends, lo, hi, bars_through)
+
+    strength = scores["strength"]
+    valid = scores["valid"]
+    result = pd.DataFrame({
+        "signal": np.where(strength >= 1, "Buy", np.where(strength <= -1, "Sell", "Hold")),
+        "strength": strength,
+    }, index=pd.Index(symbols, name="symbol"))
+    for column in ["ma0", "ma1", "ma2", "ma3", "ma4", "bb_mean", "bb_upper", "bb_lower", "rsi", "price"]:
+        result[column] = np.where(valid, scores[column], np.nan)
+    result = result.sort_values(["strength", "rsi"], ascending=[False, True], kind="stable")
+    result.insert(0, "rank", np.arange(1, len(result) + 1))
+    return result
@@ -0,0 +1,517 @@
+# local price store: one file per symbol and source, plus the date ranges it covers
+import glob
+import io
+import json
+import os
+import re
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import metrics
+
+STORE_DIR = os.getenv("TRADEBOT_STORE", "cache")
+# On-disk format for bars: "npy" (memory-mapped NumPy columns), "feather" (needs pyarrow) or "csv"
+FORMAT = os.getenv("TRADEBOT_STORE_FORMAT", "npy")
+# Column types of stored bars (and a datetime64[ns] index); the csv backend casts to them on read,
+# so it returns the same frames as the typed backends
+OHLCV_DTYPES = {"open": "float32", "high": "float32", "low": "float32", "close": "float32", "volume": "float64"}
+
+
+def _typed(df):
+    df = df.astype({col: dtype for col, dtype in OHLCV_DTYPES.items() if col in df.columns})
+    return df.set_axis(pd.DatetimeIndex(df.index).as_unit("ns"))
+
+
+def _empty():
+    return pd.DataFrame({"close": np.array([], dtype=float)}, index=pd.DatetimeIndex([]))
+
+
+def _read_csv(path):
+    return _typed(pd.read_csv(path, index_col=0, parse_dates=True))
+
+
+def _write_csv(path, df):
+    atomic_write(path, df.to_csv)
+
+
+def _append_csv(path, df):
+    df.to_csv(path, mode="a", header=False)
+    return True
+
+
+# Times _read_npy retries a read that overlapped a write (waiting 1ms, 2ms, 4ms, ...)
+_READ_RETRIES = 10
+
+
+def _read_npy(path):
+    """
+    Loads a directory of .npy columns as read-only memory maps. The returned frame wraps the
+    mapped arrays without copying, so processes reading the same symbol share the page cache.
+    A writer updates the columns before the index, so columns of another length than the index
+    mean a write is in progress: the read is retried until they agree.
+    """
+    for attempt in range(_READ_RETRIES + 1):
+        with open(os.path.join(path, "columns.json")) as f:
+            columns = json.load(f)
+        timestamps = np.load(os.path.join(path, "index.npy"), mmap_mode="r")
+        values = {col: np.load(os.path.join(path, f"{col}.npy"), mmap_mode="r") for col in columns}
+        if all(len(v) == len(timestamps) for v in values.values()):
+            break
+        if attempt == _READ_RETRIES:
+            raise OSError(f"Store at {path} is being rewritten, try again")
+        time.sleep(0.001 * 2 ** attempt)
+    index = pd.DatetimeIndex(timestamps.view("datetime64[ns]"), copy=False)
+    return pd.DataFrame(values, index=index, columns=columns, copy=False)
+
+
+def _save_array(path, values):
+    def save(tmp):
+        with open(tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(values))
+    atomic_write(path, save)
+
+
+def _write_npy(path, df):
+    """Writes one .npy file per column plus the index as int64 nanoseconds."""
+    os.makedirs(path, exist_ok=True)
+    for col in df.columns:
+        values = df[col].to_numpy()
+        if values.dtype == object:
+            values = values.astype(float)  # empty frames come back as object columns
+        _save_array(os.path.join(path, f"{col}.npy"), values)
+    _save_array(os.path.join(path, "index.npy"), pd.DatetimeIndex(df.index).as_unit("ns").asi8)
+
+    def write_columns(tmp):
+        with open(tmp, "w") as f:
+            json.dump([str(col) for col in df.columns], f)
+    atomic_write(os.path.join(path, "columns.json"), write_columns)
+
+
+def write_frame(path, df):
+    """
+    Writes a frame outside the symbol store, in the npy layout: a directory holding one .npy
+    file per column plus the index. For series kept next to the store, such as equity curves or
+    shared price caches; read_frame() maps it back without copying.
+    """
+    _write_npy(path, df)
+
+
+def read_frame(path):
+    """Returns a frame written by write_frame() as a read-only DataFrame over memory-mapped columns."""
+    return _read_npy(path)
+
+
+def append_frame(path, df):
+    """
+    Appends rows to a frame written by write_frame() in place, without rewriting it. Returns
+    False when they don't fit (other columns or dtypes).
+    """
+    return _append_npy(path, df)
+
+
+def _read_header(f):
+    """Reads a .npy header, returning (shape, fortran_order, dtype) and leaving f at the data."""
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        return np.lib.format.read_array_header_1_0(f)
+    return np.lib.format.read_array_header_2_0(f)
+
+
+def _append_array(path, values):
+    """
+    Appends values to a 1-d .npy file in place by growing the shape in its header. Returns False
+    if the file can't take them (different dtype, or a header with no room for the new shape).
+    """
+    with open(path, "r+b") as f:
+        shape, fortran_order, dtype = _read_header(f)
+        header_size = f.tell()
+        if dtype != values.dtype or len(shape) != 1 or fortran_order:
+            return False
+        header = io.BytesIO()
+        np.lib.format.write_array_header_1_0(header, {"descr": np.lib.format.dtype_to_descr(dtype),
+                                                      "fortran_order": False, "shape": (shape[0] + len(values),)})
+        if header.tell() != header_size:
+            return False
+        # Data first: until the header is rewritten, readers still see the old length
+        f.seek(0, os.SEEK_END)
+        f.write(np.ascontiguousarray(values).tobytes())
+        f.flush()
+        f.seek(0)
+        f.write(header.getvalue())
+    return True
+
+
+def _append_npy(path, df):
+    """
+    Appends rows to a npy store in place, index file last so readers never see new columns
+    without their timestamps. Returns False when the columns or dtypes don't match.
+    """
+    with open(os.path.join(path, "columns.json")) as f:
+        if json.load(f) != [str(col) for col in df.columns]:
+            return False
+    for col in df.columns:
+        with open(os.path.join(path, f"{col}.npy"), "rb") as f:
+            _, _, dtype = _read_header(f)
+        if dtype != df[col].dtype:
+            return False
+    for col in df.columns:
+        if not _append_array(os.path.join(path, f"{col}.npy"), df[col].to_numpy()):
+            return False
+    return _append_array(os.path.join(path, "index.npy"), pd.DatetimeIndex(df.index).as_unit("ns").asi8)
+
+
+def _read_feather(path):
+    import pyarrow.feather as feather
+    table = feather.read_table(path, memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+def _write_feather(path, df):
+    import pyarrow.feather as feather
+    atomic_write(path, lambda tmp: feather.write_feather(df, tmp, compression="uncompressed"))
+
+
+# format -> (file suffix, reader, writer, appender or None)
+# An appender adds rows past the last stored bar without rewriting the file; it returns False
+# when it can't, and the store falls back to the writer.
+BACKENDS = {
+    "npy": ("", _read_npy, _write_npy, _append_npy),
+    "feather": (".feather", _read_feather, _write_feather, None),
+    "csv": (".csv", _read_csv, _write_csv, _append_csv),
+}
+
+# Timeframes are ccxt-style strings: a count and a unit, m (minutes), h (hours), d (days) or w (weeks)
+_TIMEFRAME = re.compile(r"^(\d+)([mhdw])$")
+
+
+def _key(symbol, source, timeframe="1d"):
+    # Daily bars keep the plain key so stores written before timeframes existed still load
+    key = f"{symbol.replace('/', '_')}_{source}"
+    return key if timeframe == "1d" else f"{key}_{timeframe}"
+
+
+def _paths(symbol, source, fmt=None, timeframe="1d"):
+    """Returns the (data, coverage) file paths for a symbol/source/timeframe."""
+    key = _key(symbol, source, timeframe)
+    suffix = BACKENDS[fmt or FORMAT][0]
+    return os.path.join(STORE_DIR, f"{key}{suffix}"), os.path.join(STORE_DIR, f"{key}.json")
+
+
+def atomic_write(path, write):
+    """
+    Writes through a temp file so readers never see a half-written file. write(tmp) writes the
+    file at tmp, a name unique to this call, so concurrent writers (threads or processes) never
+    share one.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def coverage(symbol, source, timeframe="1d"):
+    """
+    Returns the list of (start, end) Timestamp pairs the store has already fetched for a symbol.
+    Ranges are inclusive whole days, merged and sorted.
+    """
+    _, meta_file = _paths(symbol, source, timeframe=timeframe)
+    if not os.path.exists(meta_file):
+        return []
+    with open(meta_file) as f:
+        ranges = json.load(f)["ranges"]
+    return [(pd.Timestamp(s), pd.Timestamp(e)) for s, e in ranges]
+
+
+def timeframes(symbol, source):
+    """Returns the timeframes the store holds bars for, for a symbol/source pair."""
+    key = _key(symbol, source)
+    found = []
+    for meta_file in glob.glob(os.path.join(STORE_DIR, f"{glob.escape(key)}*.json")):
+        suffix = os.path.basename(meta_file)[len(key):-len(".json")]
+        if suffix == "":
+            found.append("1d")
+        elif suffix.startswith("_") and _TIMEFRAME.match(suffix[1:]):
+            found.append(suffix[1:])
+    return found
+
+
+def _merge_ranges(ranges):
+    """Merges overlapping or touching (start, end) day ranges."""
+    merged = []
+    for s, e in sorted(ranges):
+        if merged and s <= merged[-1][1] + pd.Timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+        else:
+            merged.append((s, e))
+    return merged
+
+
+def missing_ranges(ranges, start, end):
+    """
+    Returns the parts of [start, end] not covered by ranges, as (start, end) Timestamp pairs.
+    Usually this is just a missing head and/or tail.
+    """
+    start = pd.to_datetime(start).normalize()
+    end = pd.to_datetime(end).normalize()
+    gaps = []
+    cursor = start
+    for s, e in _merge_ranges(ranges):
+        if e < cursor:
+            continue
+        if s > end:
+            break
+        if s > cursor:
+            gaps.append((cursor, s - pd.Timedelta(days=1)))
+        cursor = e + pd.Timedelta(days=1)
+        if cursor > end:
+            break
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def read(symbol, source, start=None, end=None, timeframe="1d"):
+    """
+    Returns the stored bars for a symbol between start and end (inclusive), or an empty frame.
+    The slice is positional, so with the npy backend it is still a view of the mapped file.
+    """
+    data_file, _ = _paths(symbol, source, timeframe=timeframe)
+    if not os.path.exists(data_file):
+        return _empty()
+    with metrics.timer("store_read", format=FORMAT):
+        df = BACKENDS[FORMAT][1](data_file)
+    lo = 0 if start is None else df.index.searchsorted(pd.to_datetime(start), side="left")
+    hi = len(df) if end is None else df.index.searchsorted(
+        pd.to_datetime(end).normalize() + pd.Timedelta(days=1), side="left")
+    return df.iloc[lo:hi]
+
+
+def write(symbol, source, df, start, end, timeframe="1d", checkpoint=None):
+    """
+    Merges newly fetched bars into the store and records [start, end] as covered.
+    Bars already on disk are overwritten by the new ones on the same timestamp. Bars that all
+    come after the last stored one are appended in place when the format allows it, so a long
+    download written chunk by chunk doesn't rewrite the file each time. Coverage never
+    extends past yesterday, since today's candle may still be forming.
+    checkpoint is the timestamp of the last bar saved by a download still in progress (None
+    once it has finished).
+    Bars with other columns than the stored ones (e.g. OHLCV bars arriving at a close-only
+    store written before OHLCV) replace the stored bars and their coverage instead of being
+    merged, so the old range gets downloaded again. Returns True when that happened.
+    """
+    data_file, meta_file = _paths(symbol, source, timeframe=timeframe)
+    relayout = False
+    if len(df) > 0:
+        stored = read(symbol, source, timeframe=timeframe)
+        if len(stored) > 0 and set(stored.columns) != set(df.columns):
+            stored, relayout = _empty(), True
+        appender = BACKENDS[FORMAT][3]
+        appended = (len(stored) > 0 and appender is not None and list(df.columns) == list(stored.columns)
+                    and df.index.is_monotonic_increasing and df.index.is_unique
+                    and df.index[0] > stored.index[-1] and appender(data_file, df))
+        if not appended:
+            merged = df if len(stored) == 0 else pd.concat([stored, df])
+            merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+            BACKENDS[FORMAT][2](data_file, merged)
+
+    start = pd.to_datetime(start).normalize()
+    end = min(pd.to_datetime(end).normalize(), pd.Timestamp.now().normalize() - pd.Timedelta(days=1))
+    ranges = [] if relayout else coverage(symbol, source, timeframe)
+    if start <= end:
+        ranges = _merge_ranges(ranges + [(start, end)])
+
+    meta = {"ranges": [[str(s.date()), str(e.date())] for s, e in ranges]}
+    if checkpoint is not None:
+        meta["checkpoint"] = str(pd.Timestamp(checkpoint))
+
+    def write_meta(tmp):
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+    atomic_write(meta_file, write_meta)
+    return relayout
+
+
+def checkpoint(symbol, source, timeframe="1d"):
+    """Returns the timestamp of the last bar an unfinished download saved, or None."""
+    _, meta_file = _paths(symbol, source, timeframe=timeframe)
+    if not os.path.exists(meta_file):
+        return None
+    with open(meta_file) as f:
+        saved = json.load(f).get("checkpoint")
+    return None if saved is None else pd.Timestamp(saved)
+
+
+def resume_from(symbol, source, gap_start, gap_end, timeframe="1d"):
+    """
+    Where to start downloading a gap: just past the checkpoint when an interrupted download
+    already saved part of it, otherwise gap_start.
+    """
+    saved = checkpoint(symbol, source, timeframe)
+    if saved is not None and gap_start <= saved < pd.to_datetime(gap_end) + pd.Timedelta(days=1):
+        return saved + pd.Timedelta(milliseconds=1)
+    return gap_start
+
+
+def append(symbol, source, chunk, start, timeframe="1d"):
+    """
+    Writes one chunk of a download that began at start. Coverage is recorded through the day
+    before the chunk's last bar, since that day may not be complete yet, and the last bar
+    becomes the checkpoint an interrupted download resumes from.
+    """
+    if len(chunk) > 0:
+        return write(symbol, source, chunk, start, chunk.index[-1].normalize() - pd.Timedelta(days=1), timeframe,
+                     checkpoint=chunk.index[-1])
+    return False
+
+
+def get(symbol, source, start, end, fetch, timeframe="1d"):
+    """
+    Serves [start, end] from the store, calling fetch(gap_start, gap_end) only for the parts
+    of the range that have never been downloaded (see fill()).
+
+    Args:
+        symbol: Symbol the store is keyed by
+        source: Data source or exchange name (each source has its own store)
+        start: Start date in 'YYYY-MM-DD' format
+        end: End date in 'YYYY-MM-DD' format
+        fetch: Callable taking (start, end) Timestamps and returning a DataFrame of bars, or an
+               iterable of DataFrames in time order that are written to disk as they arrive
+        timeframe: Bar size the store is keyed by, e.g. '1d' or '5m' (default: '1d')
+
+    Returns:
+        DataFrame of stored bars between start and end
+    """
+    fill(symbol, source, start, end, fetch, timeframe)
+    return read(symbol, source, start, end, timeframe)
+
+
+def fill(symbol, source, start, end, fetch, timeframe="1d"):
+    """
+    Downloads the parts of [start, end] the store doesn't cover yet, with fetch as in get(),
+    without loading the stored bars. If the fetched bars replaced a store in an older layout
+    (see write()), the rest of the range is downloaded again in a second pass.
+    """
+    gaps = missing_ranges(coverage(symbol, source, timeframe), start, end)
+    metrics.inc("store_misses" if gaps else "store_hits", source=source)
+    for attempt in range(2):
+        relayout = False
+        for gap_start, gap_end in gaps:
+            metrics.inc("store_gap_fetches", source=source)
+            bars = fetch(resume_from(symbol, source, gap_start, gap_end, timeframe), gap_end)
+            if isinstance(bars, pd.DataFrame):
+                relayout |= write(symbol, source, bars, gap_start, gap_end, timeframe)
+                continue
+            for chunk in bars:
+                relayout |= append(symbol, source, chunk, gap_start, timeframe)
+            write(symbol, source, _empty(), gap_start, gap_end, timeframe)
+        if not relayout:
+            break
+        gaps = missing_ranges(coverage(symbol, source, timeframe), start, end)
+
+
+def read_chunks(symbol, source, start=None, end=None, timeframe="1d", chunk_size=50000):
+    """
+    Yields the stored bars between start and end (inclusive) as DataFrames of at most
+    chunk_size rows, in time order. The npy backend slices its memory-mapped columns and the
+    csv backend parses chunk_size rows at a time, so only one chunk is held in memory; other
+    backends load the file and slice it.
+    """
+    data_file, _ = _paths(symbol, source, timeframe=timeframe)
+    if not os.path.exists(data_file):
+        return
+    start = None if start is None else pd.to_datetime(start)
+    stop = None if end is None else pd.to_datetime(end).normalize() + pd.Timedelta(days=1)
+    if FORMAT == "npy":
+        with open(os.path.join(data_file, "columns.json")) as f:
+            columns = json.load(f)
+        timestamps = np.load(os.path.join(data_file, "index.npy"), mmap_mode="r")
+        values = {col: np.load(os.path.join(data_file, f"{col}.npy"), mmap_mode="r") for col in columns}
+        lo = 0 if start is None else int(np.searchsorted(timestamps, start.as_unit("ns").value, side="left"))
+        hi = len(timestamps) if stop is None else int(np.searchsorted(timestamps, stop.as_unit("ns").value,
+                                                                      side="left"))
+        for first in range(lo, hi, chunk_size):
+            last = min(first + chunk_size, hi)
+            with metrics.timer("store_read", format=FORMAT):
+                index = pd.DatetimeIndex(np.array(timestamps[first:last]).view("datetime64[ns]"))
+                yield pd.DataFrame({col: np.array(v[first:last]) for col, v in values.items()}, index=index,
+                                   columns=columns)
+    elif FORMAT == "csv":
+        for chunk in pd.read_csv(data_file, index_col=0, parse_dates=True, chunksize=chunk_size):
+            if start is not None:
+                chunk = chunk[chunk.index >= start]
+            if stop is not None:
+                if len(chunk) and chunk.index[0] >= stop:
+                    return
+                chunk = chunk[chunk.index < stop]
+            if len(chunk):
+                yield _typed(chunk)
+    else:
+        df = read(symbol, source, start, end, timeframe)
+        for first in range(0, len(df), chunk_size):
+            yield df.iloc[first:first + chunk_size]
+
+
+def migrate(source_dir=".", fmt=None):
+    """
+    One-time conversion of existing caches into the store's current format.
+    Picks up the old per-window cache_{symbol}_{start}_{end}_{source}.csv files in source_dir
+    (their window becomes covered range) and any store files kept in another format.
+
+    Returns:
+        Number of files converted
+    """
+    global FORMAT
+    previous, FORMAT = FORMAT, fmt or FORMAT
+    converted = 0
+    try:
+        # Store files written in another format
+        target_suffix, _, target_writer, _ = BACKENDS[FORMAT]
+        for meta_file in sorted(glob.glob(os.path.join(STORE_DIR, "*.json"))):
+            key = os.path.basename(meta_file)[:-len(".json")]
+            target = os.path.join(STORE_DIR, f"{key}{target_suffix}")
+            if os.path.exists(target):
+                continue
+            for fmt_name, (suffix, reader, _, _) in BACKENDS.items():
+                data_file = os.path.join(STORE_DIR, f"{key}{suffix}")
+                if fmt_name != FORMAT and os.path.exists(data_file):
+                    target_writer(target, reader(data_file))
+                    converted += 1
+                    break
+
+        # Old per-window cache files
+        pattern = re.compile(r"^cache_(.+)_(\d{4}-\d{2}-\d{2})_(\d{4}-\d{2}-\d{2})_(.+)\.csv$")
+        for path in sorted(glob.glob(os.path.join(source_dir, "cache_*.csv"))):
+            match = pattern.match(os.path.basename(path))
+            if not match:
+                continue
+            symbol, start, end, source = match.groups()
+            end = pd.to_datetime(end)
+            if source == "yfinance":
+                end -= pd.Timedelta(days=1)  # yfinance windows excluded their end date
+                # Crypto caches were named BTC_USD; the data layer stores yfinance symbols as BTC-USD
+                symbol = symbol.replace("_", "-")
+            write(symbol, source, _read_csv(path), start, end)
+            converted += 1
+    finally:
+        FORMAT = previous
+    return converted
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Price store maintenance")
+    parser.add_argument("command", choices=["migrate"])
+    parser.add_argument("source_dir", nargs="?", default=".", help="Directory holding old cache_*.csv files")
+    parser.add_argument("--format", choices=list(BACKENDS), default=None, help="Target format (default: TRADEBOT_STORE_FORMAT or npy)")
+    args = parser.parse_args()
+    print(f"Converted {migrate(args.source_dir, args.format)} cache files")
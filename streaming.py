@@ -0,0 +1,169 @@
+# streaming versions of the strategies: push one candle at a time, get updated values in O(1)
+import math
+from collections import deque
+import indicator as _indicator
+
+
+class RollingWindow:
+    """
+    Fixed-size ring buffer that keeps the running sum and sum of squares of its values.
+    The sums are rebuilt from the buffer once per full cycle so rounding drift can't build up.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.values = [0.0] * size
+        self.count = 0
+        self.pos = 0
+        self.sum = 0.0
+        self.sumsq = 0.0
+        self.nonzero = 0
+        self.pushes = 0
+
+    def push(self, value):
+        """Adds a value, dropping the oldest one once the window is full."""
+        value = float(value)
+        if self.count == self.size:
+            old = self.values[self.pos]
+            self.sum -= old
+            self.sumsq -= old * old
+            self.nonzero -= old != 0
+        else:
+            self.count += 1
+        self.values[self.pos] = value
+        self.pos = (self.pos + 1) % self.size
+        self.sum += value
+        self.sumsq += value * value
+        self.nonzero += value != 0
+        self.pushes += 1
+        if self.nonzero == 0:
+            # Keep an all-zero window exactly zero (RSI treats a zero loss specially)
+            self.sum = self.sumsq = 0.0
+        elif self.pushes % self.size == 0:
+            window = self.ordered()
+            self.sum = math.fsum(window)
+            self.sumsq = math.fsum(v * v for v in window)
+
+    def ordered(self):
+        """Returns the values oldest first."""
+        if self.count < self.size:
+            return self.values[:self.count]
+        return self.values[self.pos:] + self.values[:self.pos]
+
+    def __len__(self):
+        return self.count
+
+    def mean(self):
+        return self.sum / self.count if self.count else 0
+
+    def std(self):
+        """Sample standard deviation (ddof=1), NaN with fewer than two values."""
+        if self.count < 2:
+            return float("nan")
+        var = (self.sumsq - self.sum * self.sum / self.count) / (self.count - 1)
+        return math.sqrt(max(var, 0.0))
+
+
+class StreamingMA:
+    """Moving average over the last 'window' closes; same value as strategies.movingAverages."""
+
+    def __init__(self, window=20):
+        self.closes = RollingWindow(window)
+
+    def update(self, close):
+        self.closes.push(close)
+        return self.closes.mean()
+
+
+class StreamingBollinger:
+    """Bollinger Bands over the last 'window' closes; same values as strategies.bollingerBands."""
+
+    def __init__(self, window=20, num_std=2):
+        self.closes = RollingWindow(window)
+        self.num_std = num_std
+
+    def update(self, close):
+        """Returns (mean, upper, lower)."""
+        self.closes.push(close)
+        mean = self.closes.mean()
+        std = self.closes.std()
+        if math.isnan(std) or std == 0:
+            std = 0.01  # Small default to avoid division issues
+        return mean, mean + (std * self.num_std), mean - (std * self.num_std)
+
+
+class StreamingRSI:
+    """RSI over the last 'window' price changes; same value as strategies.rsi."""
+
+    def __init__(self, window=20):
+        self.gains = RollingWindow(window)
+        self.losses = RollingWindow(window)
+        self.window = window
+        self.last = None
+        self.seen = 0
+
+    def update(self, close):
+        close = float(close)
+        if self.last is not None:
+            delta = close - self.last
+            self.gains.push(delta if delta > 0 else 0.0)
+            self.losses.push(-delta if delta < 0 else 0.0)
+        self.last = close
+        self.seen = min(self.seen + 1, self.window + 1)
+        if self.seen < 2:
+            return 50  # Neutral RSI if not enough data
+        # strategies.rsi divides both sums by the same count, so the ratio of sums is enough
+        rs = self.gains.sum / self.losses.sum if self.losses.sum != 0 else 0
+        return 100 - (100 / (1 + rs))
+
+
+class StreamingIndicator:
+    """
+    Streaming version of indicator.indicator(): push one close per bar and get a new
+    (signal_string, signal_strength) each time.
+
+    Each bar is scored over the last 'lookback' bars, like calling indicator() with start set
+    'lookback' bars back. On evenly spaced bars (e.g. daily crypto) the signal matches
+    indicator() up to floating point rounding; until lookback + 1 bars have been seen it is Hold.
+    """
+
+    def __init__(self, lookback):
+        self.lookback = lookback
+        count = lookback + 1
+        window_size = max(5, lookback // 5)
+        if count < window_size * 5:
+            window_size = max(3, count // 5)
+        self.window_size = window_size
+        self.enough_data = count >= 10
+        self.closes = RollingWindow(window_size)
+        self.rsi = StreamingRSI(window_size)
+        # Moving average history, newest last; MA k ends window_size * (k + 1) bars after the lookback start
+        self.ma_history = deque(maxlen=lookback + 1)
+        self.ma_lags = [max(0, lookback - window_size * (k + 1)) for k in range(5)]
+        self.recent = deque(maxlen=10)
+        self.bars = 0
+
+    def update(self, close):
+        """Adds one bar and returns the signal at that bar."""
+        close = float(close)
+        self.bars += 1
+        self.closes.push(close)
+        self.ma_history.append(self.closes.mean())
+        rsi = self.rsi.update(close)
+        self.recent.append(close)
+        if self.bars <= self.lookback or not self.enough_data:
+            return ("Hold", 0)
+
+        MAs = [self.ma_history[-1 - lag] for lag in self.ma_lags]
+        std = self.closes.std()
+        if math.isnan(std) or std == 0:
+            std = 0.01
+        mean = self.closes.mean()
+        return _indicator.score_components(MAs, close, mean + std * 2, mean - std * 2, rsi, min(self.recent))
+
+    def warm_up(self, df):
+        """Feeds the closes of a DataFrame through the indicator and returns the last signal."""
+        signal = ("Hold", 0)
+        for close in df["close"].to_numpy(dtype=float):
+            signal = self.update(close)
+        return signal
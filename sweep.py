@@ -0,0 +1,107 @@
+# parameter sweeps: run many backtests across a process pool and collect one results table
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from data import getData, getCryptoData
+from indicator import backtest_signals
+from backtest import simulate
+import pricecache
+
+# Risk parameters a sweep can vary, with backtest()'s defaults
+DEFAULT_PARAMS = {"stop_loss_pct": 0.05, "take_profit_pct": 0.15, "max_signal_strength": 3}
+
+# The shared price cache, attached by each worker once, when the pool starts
+_prices = None
+
+
+def _init_worker(handle):
+    global _prices
+    _prices = pricecache.attach(handle)
+
+
+def _slice(df, start, end):
+    """Bars between start and end (inclusive), the same rows backtest() would fetch."""
+    lo = df.index.searchsorted(pd.to_datetime(start), side="left")
+    hi = df.index.searchsorted(pd.to_datetime(end) + pd.Timedelta(days=1), side="left")
+    return df.iloc[lo:hi]
+
+
+def _run_task(task):
+    """
+    Runs every parameter combination for one (symbol, start, end). Signals don't depend on the
+    risk parameters, so they are computed once and reused for the whole grid.
+    """
+    symbol, start, end, combos, initial_investment, asset_type = task
+    df = _slice(_prices.get(symbol), start, end)
+    total_days = (pd.to_datetime(end) - pd.to_datetime(start)).days
+    window_size = max(1, total_days // 5)
+    rows = []
+    if df.empty or len(df) < window_size:
+        return rows
+    signal_labels, signal_strengths = backtest_signals(df, window_size)
+    closes = df["close"].to_numpy(dtype=float)
+    for params in combos:
+        result = simulate(closes, window_size, signal_labels, signal_strengths, initial_investment, asset_type, **params)
+        rows.append({
+            "symbol": symbol,
+            "start": start,
+            "end": end,
+            **params,
+            "gain": result["gain"],
+            "final_value": result["final_value"],
+            "buys": result["trades_executed"]["Buy"],
+            "sells": result["trades_executed"]["Sell"],
+            "max_drawdown": result["max_drawdown"],
+        })
+    return rows
+
+
+def _param_combos(param_grid):
+    """Every combination of a parameter grid, with backtest()'s defaults for missing parameters."""
+    grid = {**{name: [value] for name, value in DEFAULT_PARAMS.items()}, **(param_grid or {})}
+    unknown = set(grid) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+    return [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+
+
+def sweep(symbols, date_ranges, param_grid=None, initial_investment=10000, asset_type="stock", max_workers=None):
+    """
+    Backtests every combination of symbol, date range and risk parameters in parallel.
+    
+    Args:
+        symbols: List of symbols
+        date_ranges: List of (start, end) tuples in 'YYYY-MM-DD' format
+        param_grid: Dict of parameter name -> list of values to try, for any of stop_loss_pct,
+                    take_profit_pct and max_signal_strength (missing ones use backtest()'s default)
+        initial_investment: Starting capital (default: 10000)
+        asset_type: "stock" or "crypto" (default: "stock")
+        max_workers: Number of worker processes (default: one per CPU)
+    
+    Returns:
+        DataFrame with one row per run: symbol, start, end, the parameters, gain, final_value,
+        buys, sells and max_drawdown
+    """
+    combos = _param_combos(param_grid)
+
+    tasks = [(symbol, start, end, combos, initial_investment, asset_type)
+             for symbol in symbols for start, end in date_ranges]
+    rows = []
+    # Load each symbol once over the union of all ranges into the shared price cache; workers
+    # slice their windows from zero-copy views of it instead of each getting a copy
+    first = min(pd.to_datetime(start) for start, _ in date_ranges).strftime("%Y-%m-%d")
+    last = max(pd.to_datetime(end) for _, end in date_ranges).strftime("%Y-%m-%d")
+    with pricecache.PriceCache() as prices:
+        for symbol in symbols:
+            if asset_type == "crypto":
+                df = getCryptoData(symbol, start=first, end=last, columns=["close"])
+            else:
+                df = getData(symbol, start=first, end=last, columns=["close"])
+            prices.put(symbol, df.astype(np.float64))
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                                 initializer=_init_worker, initargs=(prices.handle,)) as pool:
+            for task_rows in pool.map(_run_task, tasks):
+                rows.extend(task_rows)
+    return pd.DataFrame(rows)
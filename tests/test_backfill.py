@@ -0,0 +1,58 @@
+# an interrupted backfill resumes from the store's checkpoint
+import numpy as np
+import pytest
+import backfill
+import data
+import store
+from bench import synthetic_ohlcv
+
+
+class FlakyReplay(data.ReplayProvider):
+    """Replays recorded bars, failing the request after the first 'fail_after' pages once."""
+
+    def __init__(self, directory, fail_after):
+        super().__init__(directory, name="flakyex")
+        self.fail_after = fail_after
+        self.requested = []  # since of every page served
+
+    def fetch_page(self, symbol, since, limit, timeframe):
+        if len(self.requested) == self.fail_after:
+            self.fail_after = None
+            raise ConnectionError("connection reset")
+        self.requested.append(since)
+        return super().fetch_page(symbol, since, limit, timeframe)
+
+
+@pytest.fixture
+def flaky(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "STORE_DIR", str(tmp_path / "store"))
+    provider = FlakyReplay(str(tmp_path / "replay"), fail_after=2)
+    monkeypatch.setitem(data._providers, provider.name, provider)
+    return provider
+
+
+def test_backfill_resumes_after_a_failed_page(flaky):
+    # 90 days of hourly bars, two of its three pages in before the failure (backfill writes every page)
+    bars = synthetic_ohlcv(90 / 365, seed=3, end="2021-03-31 23:00", freq="h")
+    flaky.record("BTC/USDT", bars, "1h")
+    start, end = str(bars.index[0].date()), str(bars.index[-1].date())
+
+    pending = backfill.backfill(["BTC/USDT"], start, end, exchange=flaky.name, timeframe="1h",
+                                retries=1, retry_delay=0)
+
+    assert pending == []
+    first_pass, retry = flaky.requested[:2], flaky.requested[2:]
+    assert retry, "the failed symbol was not retried"
+    # The retry starts just past the last bar saved before the failure and never asks again
+    # for a page it already has
+    saved_through = bars.index[data.PAGE_LIMIT * 2 - 1]
+    assert retry[0] == saved_through.value // 10**6 + 1
+    assert len(set(flaky.requested)) == len(flaky.requested)
+    assert min(retry) > max(first_pass)
+    assert len(flaky.requested) == -(-len(bars) // data.PAGE_LIMIT)
+    assert not store.missing_ranges(store.coverage("BTC/USDT", flaky.name, "1h"), start, end)
+
+    stored = store.read("BTC/USDT", flaky.name, timeframe="1h")
+    np.testing.assert_array_equal(stored.index.as_unit("ms"), bars.index.as_unit("ms"))
+    np.testing.assert_allclose(stored[["open", "high", "low", "close", "volume"]].to_numpy(dtype=float),
+                               bars[["open", "high", "low", "close", "volume"]].to_numpy())
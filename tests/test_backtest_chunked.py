@@ -0,0 +1,93 @@
+# the out-of-core backtest against the in-memory vectorized one
+import numpy as np
+import pytest
+import data
+import store
+from backtest import backtest, backtest_chunked, NullReporter
+from bench import synthetic_ohlcv
+
+
+@pytest.fixture
+def replay(tmp_path, monkeypatch):
+    """A fresh store fed by recorded bars, served as the 'alphavantage' source."""
+    monkeypatch.setattr(store, "STORE_DIR", str(tmp_path / "store"))
+    provider = data.ReplayProvider(str(tmp_path / "replay"), name="alphavantage")
+    data.useProviders([provider])
+    yield provider
+    data.useProviders(None)
+
+
+@pytest.mark.parametrize("asset_type,fifo", [("stock", True), ("crypto", False)])
+@pytest.mark.parametrize("chunk_size", [7, 150, 10**6])
+def test_exact_chunked_matches_vectorized(replay, tmp_path, asset_type, fifo, chunk_size):
+    df = synthetic_ohlcv(2, seed=40)
+    replay.record("SYM", df)
+    start, end = str(df.index[0].date()), str(df.index[-1].date())
+    expected = backtest("SYM", start, end, asset_type=asset_type, fifo=fifo, vectorized=True, headless=True,
+                        store_results=False)
+    result = backtest_chunked("SYM", start, end, asset_type=asset_type, fifo=fifo, chunk_size=chunk_size,
+                              exact=True, output_dir=str(tmp_path / "run"), reporter=NullReporter())
+    for name in ["gain", "final_value", "cash", "shares", "max_drawdown", "signals_generated", "trades_executed"]:
+        assert result[name] == expected[name], name
+    np.testing.assert_array_equal(np.asarray(result["portfolio_value"]), np.asarray(expected["portfolio_value"]))
+    np.testing.assert_array_equal(np.asarray(result["dates"]), np.asarray(expected["dates"]))
+
+
+@pytest.mark.parametrize("timeframe,years,freq", [("1d", 5, "D"), ("1h", 0.3, "h")])
+@pytest.mark.parametrize("chunk_size", [500, 10**6])
+def test_default_chunked_matches_vectorized(replay, tmp_path, timeframe, years, freq, chunk_size):
+    # The default reduces windows through cumulative tables; on these series no component sits
+    # on a threshold within rounding, so signals and results are the same as the exact engine's
+    df = synthetic_ohlcv(years, seed=43, freq=freq)
+    replay.record("SYM", df, timeframe)
+    start, end = str(df.index[0].date()), str(df.index[-1].date())
+    expected = backtest("SYM", start, end, asset_type="crypto", vectorized=True, headless=True, timeframe=timeframe,
+                        store_results=False)
+    result = backtest_chunked("SYM", start, end, asset_type="crypto", timeframe=timeframe, chunk_size=chunk_size,
+                              output_dir=str(tmp_path / "run"), reporter=NullReporter())
+    for name in ["gain", "final_value", "max_drawdown", "signals_generated", "trades_executed"]:
+        assert result[name] == expected[name], name
+    np.testing.assert_array_equal(np.asarray(result["portfolio_value"]), np.asarray(expected["portfolio_value"]))
+
+
+def test_chunked_intraday_matches_vectorized(replay, tmp_path):
+    df = synthetic_ohlcv(0.05, seed=41, freq="min")
+    replay.record("SYM", df, "1m")
+    start, end = str(df.index[0].date()), str(df.index[-1].date())
+    expected = backtest("SYM", start, end, asset_type="crypto", vectorized=True, headless=True, timeframe="1m",
+                        store_results=False)
+    result = backtest_chunked("SYM", start, end, asset_type="crypto", timeframe="1m", chunk_size=5000, exact=True,
+                              output_dir=str(tmp_path / "run"), reporter=NullReporter())
+    assert result["final_value"] == expected["final_value"]
+    np.testing.assert_array_equal(np.asarray(result["portfolio_value"]), np.asarray(expected["portfolio_value"]))
+
+
+def test_not_enough_data_goes_to_reporter(replay, tmp_path):
+    replay.record("SHORT", synthetic_ohlcv(0.01, seed=42))
+    messages = []
+
+    class Recorder(NullReporter):
+        def message(self, text):
+            messages.append(text)
+
+    assert backtest_chunked("SHORT", "2024-01-01", "2024-12-31", output_dir=str(tmp_path / "run"),
+                            reporter=Recorder()) is None
+    assert messages == ["Not enough data to run backtest."]
+
+
+def test_reporter_gets_start_and_finish(replay, tmp_path):
+    df = synthetic_ohlcv(1, seed=44)
+    replay.record("SYM", df)
+    calls = []
+
+    class Recorder(NullReporter):
+        def start(self, frame, window_size, stop_loss_pct, take_profit_pct, bars=None):
+            calls.append(("start", frame["close"].tolist(), bars))
+
+        def finish(self, result):
+            calls.append(("finish", result["bars"]))
+
+    backtest_chunked("SYM", str(df.index[0].date()), str(df.index[-1].date()), chunk_size=100,
+                     output_dir=str(tmp_path / "run"), reporter=Recorder())
+    closes = df["close"].astype("float32").tolist()
+    assert calls == [("start", [closes[0], closes[-1]], len(df)), ("finish", len(df))]
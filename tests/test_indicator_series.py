@@ -0,0 +1,42 @@
+# indicator_series() against indicator() called once per evaluation date
+import numpy as np
+import pandas as pd
+import pytest
+from bench import synthetic_ohlcv
+from indicator import indicator, indicator_series
+
+
+@pytest.fixture(scope="module")
+def df():
+    df = synthetic_ohlcv(2, seed=10)[["close"]]
+    # A few missing stretches, so windows don't always hold the same number of bars
+    return df.drop(df.index[100:115]).drop(df.index[400:404])
+
+
+def _dates(df, count=40, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DatetimeIndex(np.sort(rng.choice(df.index[60:], count, replace=False)))
+
+
+def test_fixed_start_matches_indicator(df):
+    start = str(df.index[0].date())
+    dates = _dates(df)
+    series = indicator_series(df, dates, start=start)
+    for date in dates:
+        signal, strength = indicator(df, start, date)
+        assert (series.loc[date, "signal"], series.loc[date, "strength"]) == (signal, strength), date
+
+
+@pytest.mark.parametrize("lookback", [30, "120D"])
+def test_rolling_lookback_matches_indicator(df, lookback):
+    dates = _dates(df, seed=1)
+    series = indicator_series(df, dates, lookback=lookback)
+    delta = pd.Timedelta(days=lookback) if isinstance(lookback, int) else pd.Timedelta(lookback)
+    for date in dates:
+        signal, strength = indicator(df, date - delta, date)
+        assert (series.loc[date, "signal"], series.loc[date, "strength"]) == (signal, strength), date
+
+
+def test_requires_start_or_lookback(df):
+    with pytest.raises(ValueError):
+        indicator_series(df, df.index[-5:])
@@ -0,0 +1,46 @@
+# the 2-D Monte Carlo engine against the 1-D backtest path, path by path
+import numpy as np
+import pytest
+from backtest import simulate
+from bench import synthetic_ohlcv
+from indicator import backtest_signals, CumulativeTables
+from montecarlo import bootstrap_paths, monte_carlo, path_signals, simulate_paths
+
+
+@pytest.fixture(scope="module")
+def history():
+    df = synthetic_ohlcv(2, seed=30)[["close"]].astype(float)
+    paths = bootstrap_paths(df["close"].to_numpy(), 12, rng=np.random.default_rng(0))
+    return df, paths, len(df) // 5
+
+
+def test_path_signals_match_backtest_signals(history):
+    df, paths, window_size = history
+    strengths = path_signals(paths, df.index, window_size)
+    for path, row in zip(paths, strengths):
+        frame = df.assign(close=path)
+        _, expected = backtest_signals(frame, window_size, reductions=CumulativeTables(path))
+        np.testing.assert_array_equal(row, expected)
+
+
+@pytest.mark.parametrize("asset_type", ["stock", "crypto"])
+def test_simulate_paths_matches_simulate(history, asset_type):
+    df, paths, window_size = history
+    strengths = path_signals(paths, df.index, window_size)
+    batch = simulate_paths(paths, window_size, strengths, asset_type=asset_type)
+    for k, (path, row) in enumerate(zip(paths, strengths)):
+        labels = np.where(row >= 1, "Buy", np.where(row <= -1, "Sell", "Hold"))
+        single = simulate(path, window_size, labels, row, asset_type=asset_type)
+        assert batch["gain"][k] == single["gain"]
+        assert batch["final_value"][k] == single["final_value"]
+        assert batch["max_drawdown"][k] == pytest.approx(single["max_drawdown"], rel=1e-12, abs=1e-12)
+        assert batch["buys"][k] == single["trades_executed"]["Buy"]
+        assert batch["sells"][k] == single["trades_executed"]["Sell"]
+
+
+def test_monte_carlo_does_not_depend_on_workers(history):
+    df = history[0]
+    start, end = str(df.index[0].date()), str(df.index[-1].date())
+    one = monte_carlo(df, start, end, n_paths=40, seed=5, batch_size=16, max_workers=1)
+    two = monte_carlo(df, start, end, n_paths=40, seed=5, batch_size=16, max_workers=2)
+    assert one["paths"].equals(two["paths"])
@@ -0,0 +1,75 @@
+# FIFO lot accounting in Position, checked against hand-computed fills
+import numpy as np
+import pytest
+from position import Position
+
+
+def test_fifo_realized_pnl_lot_by_lot():
+    position = Position(fifo=True)
+    realized = 0.0
+
+    def sell(quantity, price):
+        nonlocal realized
+        cost = position.sell(quantity)
+        realized += quantity * price - cost
+        return cost
+
+    position.buy(10, 100)
+    position.buy(5, 110)
+    position.buy(20, 90)
+
+    # 12 @ 120 takes the whole first lot and 2 of the second: cost 10*100 + 2*110
+    assert sell(12, 120) == pytest.approx(1220)
+    assert realized == pytest.approx(220)
+    assert (position.quantity, position.cost) == pytest.approx((23, 3 * 110 + 20 * 90))
+    assert position.avg_price == pytest.approx(2130 / 23)
+
+    # 3 @ 95 finishes the second lot exactly, at a loss
+    assert sell(3, 95) == pytest.approx(330)
+    assert realized == pytest.approx(220 - 45)
+    assert position.avg_price == pytest.approx(90)
+
+    # 22 @ 100 spans the 90 lot and a new 80 lot bought after the earlier sells
+    position.buy(5, 80)
+    assert sell(22, 100) == pytest.approx(20 * 90 + 2 * 80)
+    assert realized == pytest.approx(220 - 45 + 240)
+    assert (position.quantity, position.cost) == pytest.approx((3, 240))
+    assert position.avg_price == pytest.approx(80)
+
+    # Selling the rest closes the position
+    assert sell(3, 70) == pytest.approx(240)
+    assert realized == pytest.approx(385)
+    assert (position.quantity, position.cost, position.avg_price) == (0.0, 0.0, 0.0)
+
+
+def test_average_cost_keeps_the_entry_price():
+    position = Position()
+    position.buy(10, 100)
+    position.buy(10, 120)
+    assert position.sell(5) == pytest.approx(5 * 110)
+    assert position.avg_price == pytest.approx(110)
+
+
+def test_fifo_matches_a_list_of_lots_across_growth():
+    # Enough lots to make the arrays grow and compact, with sells spanning several lots
+    rng = np.random.default_rng(0)
+    position = Position(fifo=True)
+    lots = []
+    for step in range(400):
+        if step % 3 == 2 and lots:
+            quantity = rng.uniform(0, sum(q for q, _ in lots) * 0.8)
+            expected, remaining = 0.0, quantity
+            while remaining > 0 and lots:
+                take = min(lots[0][0], remaining)
+                expected += take * lots[0][1]
+                remaining -= take
+                lots[0][0] -= take
+                if lots[0][0] == 0:
+                    lots.pop(0)
+            assert position.sell(quantity) == pytest.approx(expected)
+        else:
+            quantity, price = rng.uniform(1, 10), rng.uniform(50, 150)
+            position.buy(quantity, price)
+            lots.append([quantity, price])
+        assert position.quantity == pytest.approx(sum(q for q, _ in lots))
+        assert position.cost == pytest.approx(sum(q * p for q, p in lots))
@@ -0,0 +1,38 @@
+# screener.screen() on a panel against indicator() on each symbol's own bars
+import numpy as np
+import pandas as pd
+from bench import synthetic_ohlcv
+from indicator import indicator
+from screener import screen
+
+
+def _panel(symbols=40, seed=20):
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for j in range(symbols):
+        close = synthetic_ohlcv(1, seed=seed + j)["close"].astype(float)
+        if j % 3 == 1:
+            close = close[close.index.dayofweek < 5]      # business-day calendar
+        if j % 4 == 2:
+            first = rng.integers(0, len(close) - 30)
+            close = close.drop(close.index[first:first + 20])  # a gap
+        if j % 5 == 3:
+            close = close.iloc[-rng.integers(5, 60):]     # short history
+        columns[f"S{j}"] = close
+    return pd.DataFrame(columns)
+
+
+def test_screen_matches_indicator():
+    panel = _panel()
+    start, end = "2024-03-01", "2024-12-31"
+    ranked = screen(panel, start, end)
+    assert sorted(ranked.index) == sorted(panel.columns)
+    for symbol in panel.columns:
+        df = panel[[symbol]].dropna().rename(columns={symbol: "close"})
+        signal, strength = indicator(df, start, end)
+        assert (ranked.loc[symbol, "signal"], ranked.loc[symbol, "strength"]) == (signal, strength), symbol
+
+
+def test_screen_ranks_strongest_buy_first():
+    ranked = screen(_panel(seed=7), "2024-06-01", "2024-12-31")
+    assert list(ranked["strength"]) == sorted(ranked["strength"], reverse=True)
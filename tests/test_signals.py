@@ -0,0 +1,67 @@
+# the vectorized signal engine against the per-bar indicator() path it replaces
+import numpy as np
+import pytest
+from backtest import signals_per_bar
+from bench import synthetic_ohlcv
+from indicator import backtest_signals, CumulativeTables
+
+
+def _daily():
+    return synthetic_ohlcv(1, seed=1)[["close"]]
+
+
+def _business_days():
+    df = synthetic_ohlcv(1.4, seed=2)[["close"]]
+    return df[df.index.dayofweek < 5]
+
+
+def _flat():
+    df = synthetic_ohlcv(1, seed=3)[["close"]]
+    df["close"] = np.float32(42.0)
+    return df
+
+
+def _gapped():
+    df = synthetic_ohlcv(1.2, seed=4)[["close"]]
+    keep = np.ones(len(df), dtype=bool)
+    for first in (40, 150, 300):
+        keep[first:first + 12] = False
+    return df[keep]
+
+
+SERIES = {"daily": _daily, "business_days": _business_days, "flat": _flat, "gapped": _gapped}
+
+
+@pytest.mark.parametrize("name", SERIES)
+@pytest.mark.parametrize("window_size", [20, 73])
+def test_backtest_signals_match_per_bar(name, window_size):
+    df = SERIES[name]()
+    labels, strengths = backtest_signals(df, window_size)
+    expected_labels, expected_strengths = signals_per_bar(df, window_size)
+    np.testing.assert_array_equal(labels, expected_labels)
+    np.testing.assert_array_equal(strengths, expected_strengths)
+
+
+def test_backtest_signals_match_per_bar_intraday():
+    df = synthetic_ohlcv(3 / 365, seed=5, freq="h")[["close"]]
+    labels, strengths = backtest_signals(df, 14, timeframe="1h")
+    expected_labels, expected_strengths = signals_per_bar(df, 14, timeframe="1h")
+    np.testing.assert_array_equal(labels, expected_labels)
+    np.testing.assert_array_equal(strengths, expected_strengths)
+
+
+def test_short_series_holds():
+    df = _daily().iloc[:8]
+    labels, strengths = signals_per_bar(df, 3)
+    assert list(labels) == ["Hold"] * len(df)
+    assert not strengths.any()
+    np.testing.assert_array_equal(backtest_signals(df, 3)[1], strengths)
+
+
+@pytest.mark.parametrize("name", ["daily", "gapped"])
+def test_cumulative_tables_match_exact_reductions(name):
+    df = SERIES[name]()
+    close = df["close"].to_numpy(dtype=float)
+    exact = backtest_signals(df, 60)
+    tables = backtest_signals(df, 60, reductions=CumulativeTables(close))
+    np.testing.assert_array_equal(tables[1], exact[1])
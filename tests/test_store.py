@@ -0,0 +1,77 @@
+# the local price store: npy reads racing writes, and backends agreeing on the bars they return
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+import store
+from bench import synthetic_ohlcv
+
+
+def _bars(n, first=0):
+    index = pd.date_range("2024-01-01", periods=first + n, freq="D")[first:]
+    return pd.DataFrame({"close": np.arange(first, first + n, dtype="float32")}, index=index)
+
+
+def test_npy_read_waits_for_append_in_progress(tmp_path):
+    path = str(tmp_path / "bars")
+    store._write_npy(path, _bars(10))
+    more = _bars(5, first=10)
+    # The column is appended, the index not yet: what a reader sees in the middle of an append
+    store._append_array(f"{path}/close.npy", more["close"].to_numpy())
+    finish = threading.Timer(0.02, store._append_array,
+                             (f"{path}/index.npy", pd.DatetimeIndex(more.index).as_unit("ns").asi8))
+    finish.start()
+    try:
+        df = store._read_npy(path)
+    finally:
+        finish.join()
+    assert len(df) == 15
+    np.testing.assert_array_equal(df["close"].to_numpy(), np.arange(15, dtype="float32"))
+
+
+def _formats():
+    formats = ["npy", "csv"]
+    try:
+        import pyarrow  # noqa: F401
+        formats.append("feather")
+    except ImportError:
+        pass
+    return formats
+
+
+@pytest.mark.parametrize("fmt", _formats())
+def test_backends_return_the_same_bars(tmp_path, monkeypatch, fmt):
+    monkeypatch.setattr(store, "STORE_DIR", str(tmp_path))
+    monkeypatch.setattr(store, "FORMAT", fmt)
+    df = synthetic_ohlcv(1, seed=50)
+    df.index = df.index.as_unit("ns")
+    store.write("SYM", "alphavantage", df, str(df.index[0].date()), str(df.index[-1].date()))
+    pd.testing.assert_frame_equal(store.read("SYM", "alphavantage"), df, check_freq=False)
+    chunks = list(store.read_chunks("SYM", "alphavantage", chunk_size=100))
+    pd.testing.assert_frame_equal(pd.concat(chunks), df, check_freq=False)
+
+
+def test_atomic_write_from_many_threads(tmp_path):
+    path = str(tmp_path / "meta.json")
+    errors = []
+
+    def writer(n):
+        def write(tmp):
+            with open(tmp, "w") as f:
+                f.write(str(n) * 1000)
+        try:
+            for _ in range(50):
+                store.atomic_write(path, write)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    with open(path) as f:
+        content = f.read()
+    assert len(set(content)) == 1 and len(content) == 1000
+    assert [name for name in tmp_path.iterdir() if name.suffix == ".tmp"] == []
@@ -0,0 +1,78 @@
+"""
+Command-line entry point, kept light so one-off jobs (cron, scripts) start quickly:
+providers and plotting are only imported when a command needs them.
+
+    python -m tradebot signal AAPL --start 2024-01-01 --end 2024-12-31
+    python -m tradebot signal BTC/USDT --start 2024-01-01 --end 2024-12-31 --asset-type crypto
+    python -m tradebot backfill BTC/USDT ETH/USDT --start 2020-01-01 --end 2024-12-31 --timeframe 1m --rate 5
+    python -m tradebot serve --port 8765      # then GET /signal?symbol=AAPL&start=...&end=...
+"""
+import argparse
+import sys
+
+
+def _signal(args):
+    from indicator import indicator
+
+    signal, strength = indicator(args.symbol, args.start, args.end, asset_type=args.asset_type)
+    print(f"{args.symbol}: {signal} (strength {strength})")
+    return 0
+
+
+def _backfill(args):
+    from backfill import backfill
+
+    incomplete = backfill(args.symbols, args.start, args.end, exchange=args.exchange, timeframe=args.timeframe,
+                          max_concurrency=args.concurrency, rate=args.rate, retries=args.retries)
+    return 1 if incomplete else 0
+
+
+def _serve(args):
+    import asyncio
+    from daemon import serve, SignalService
+
+    service = SignalService(max_series=args.max_series, refresh=args.refresh)
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix_socket, service))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="tradebot", description="TradeBot signals from the command line")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    signal = commands.add_parser("signal", help="Print the signal for one symbol")
+    signal.add_argument("symbol", help="Stock ticker or crypto pair, e.g. AAPL or BTC/USDT")
+    signal.add_argument("--start", required=True, help="Start date in 'YYYY-MM-DD' format")
+    signal.add_argument("--end", required=True, help="End date in 'YYYY-MM-DD' format")
+    signal.add_argument("--asset-type", choices=["stock", "crypto"], default="stock")
+    signal.set_defaults(func=_signal)
+
+    bulk = commands.add_parser("backfill", help="Download history for many crypto symbols into the store (resumable)")
+    bulk.add_argument("symbols", nargs="+", help="Crypto pairs, e.g. BTC/USDT ETH/USDT")
+    bulk.add_argument("--start", required=True, help="Start date in 'YYYY-MM-DD' format")
+    bulk.add_argument("--end", required=True, help="End date in 'YYYY-MM-DD' format")
+    bulk.add_argument("--exchange", default="binance")
+    bulk.add_argument("--timeframe", default="1d", help="Bar size, e.g. 1m, 1h, 1d")
+    bulk.add_argument("--concurrency", type=int, default=4, help="Symbols downloading at the same time")
+    bulk.add_argument("--rate", type=float, default=None, help="Maximum requests per second across all symbols")
+    bulk.add_argument("--retries", type=int, default=3, help="Extra attempts for symbols that fail")
+    bulk.set_defaults(func=_backfill)
+
+    daemon = commands.add_parser("serve", help="Answer signal queries over HTTP from warm in-memory data")
+    daemon.add_argument("--host", default="127.0.0.1")
+    daemon.add_argument("--port", type=int, default=8765)
+    daemon.add_argument("--unix-socket", default=None, help="Listen on this Unix socket path instead of host:port")
+    daemon.add_argument("--max-series", type=int, default=256, help="Price series kept in memory")
+    daemon.add_argument("--refresh", type=float, default=60.0,
+                        help="Seconds before a series is reloaded for queries past its last bar")
+    daemon.set_defaults(func=_serve)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
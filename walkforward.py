@@ -0,0 +1,126 @@
+# walk-forward optimization: choose the signal window in sample, then measure it out of sample
+import numpy as np
+import pandas as pd
+import data
+from indicator import backtest_signals, CumulativeTables
+from backtest import simulate
+from sweep import _param_combos
+
+
+def walk_forward_splits(start, end, train_days=365, test_days=90, step_days=None):
+    """
+    Rolling in-sample/out-of-sample splits between start and end: a train_days training
+    period followed by a test_days test period, moved forward step_days (default: test_days)
+    at a time. Returns a list of (train_start, train_end, test_start, test_end) Timestamps,
+    all inclusive.
+    """
+    start = pd.to_datetime(start)
+    end = pd.to_datetime(end)
+    step = pd.Timedelta(days=step_days or test_days)
+    splits = []
+    train_start = start
+    while True:
+        test_start = train_start + pd.Timedelta(days=train_days)
+        test_end = test_start + pd.Timedelta(days=test_days - 1)
+        if test_end > end:
+            break
+        splits.append((train_start, test_start - pd.Timedelta(days=1), test_start, test_end))
+        train_start += step
+    return splits
+
+
+def walk_forward(symbol_or_df, start, end, windows=(10, 20, 30, 60, 90), splits=None, train_days=365,
+                 test_days=90, step_days=None, param_grid=None, initial_investment=10000,
+                 asset_type="stock", timeframe="1d"):
+    """
+    Walk-forward optimization of the signal window (and optionally the risk parameters).
+
+    Prices are loaded once and turned into cumulative-sum tables, and the signal of every bar
+    is computed once per candidate window from those tables. Every split then only replays
+    the position logic over its slice of the cached signals: in sample for each candidate,
+    out of sample for all of them, with the in-sample winner marked as selected. Signals only
+    look back, so bars before a period serve as its warm-up and every bar of it is traded.
+
+    Args:
+        symbol_or_df: Symbol to fetch, or a DataFrame with a 'close' column and datetime index
+        start: Start date in 'YYYY-MM-DD' format
+        end: End date in 'YYYY-MM-DD' format
+        windows: Candidate signal windows, in bars (default: 10, 20, 30, 60, 90)
+        splits: List of (train_start, train_end, test_start, test_end) dates (default: rolling
+                splits from walk_forward_splits(start, end, train_days, test_days, step_days))
+        train_days: In-sample period length in days (default: 365)
+        test_days: Out-of-sample period length in days (default: 90)
+        step_days: Days between consecutive splits (default: test_days)
+        param_grid: Dict of risk parameter -> values to try, as in sweep() (default: backtest()'s defaults)
+        initial_investment: Starting capital of every period (default: 10000)
+        asset_type: "stock" or "crypto" (default: "stock")
+        timeframe: Bar size, e.g. '1h', '1d' (default: '1d')
+
+    Returns:
+        Dict with results (DataFrame, one row per split, window and parameter set: the split
+        dates, window, parameters, in_sample_gain, in_sample_drawdown, out_of_sample_gain,
+        out_of_sample_drawdown, out_of_sample_trades and selected), selected (the selected
+        rows only) and out_of_sample_gain (the selected out-of-sample gains compounded, in percent)
+    """
+    if isinstance(symbol_or_df, pd.DataFrame):
+        df = symbol_or_df[["close"]]
+    elif asset_type == "crypto":
+        df = data.getCryptoData(symbol_or_df, start=start, end=end, columns=["close"], timeframe=timeframe)
+    else:
+        df = data.getData(symbol_or_df, start=start, end=end, columns=["close"], timeframe=timeframe)
+    df = df.set_axis(pd.to_datetime(df.index)).sort_index().astype(np.float64)
+    if splits is None:
+        splits = walk_forward_splits(start, end, train_days, test_days, step_days)
+    combos = _param_combos(param_grid)
+
+    closes = df["close"].to_numpy()
+    tables = CumulativeTables(closes)
+    signals = {window: backtest_signals(df, window, timeframe, reductions=tables) for window in windows}
+
+    def rows_of(period_start, period_end):
+        lo = df.index.searchsorted(pd.to_datetime(period_start), side="left")
+        hi = df.index.searchsorted(pd.to_datetime(period_end) + pd.Timedelta(days=1), side="left")
+        return slice(lo, hi)
+
+    def run(rows, window, params):
+        labels, strengths = signals[window]
+        return simulate(closes[rows], 0, labels[rows], strengths[rows], initial_investment, asset_type, **params)
+
+    records = []
+    for split, (train_start, train_end, test_start, test_end) in enumerate(splits):
+        train_rows = rows_of(train_start, train_end)
+        test_rows = rows_of(test_start, test_end)
+        if train_rows.stop <= train_rows.start or test_rows.stop <= test_rows.start:
+            continue
+        split_records = []
+        for window in windows:
+            for params in combos:
+                in_sample = run(train_rows, window, params)
+                out_of_sample = run(test_rows, window, params)
+                split_records.append({
+                    "split": split,
+                    "train_start": pd.to_datetime(train_start),
+                    "train_end": pd.to_datetime(train_end),
+                    "test_start": pd.to_datetime(test_start),
+                    "test_end": pd.to_datetime(test_end),
+                    "window": window,
+                    **params,
+                    "in_sample_gain": in_sample["gain"],
+                    "in_sample_drawdown": in_sample["max_drawdown"],
+                    "out_of_sample_gain": out_of_sample["gain"],
+                    "out_of_sample_drawdown": out_of_sample["max_drawdown"],
+                    "out_of_sample_trades": len(out_of_sample["trades"]),
+                    "selected": False,
+                })
+        best = max(range(len(split_records)), key=lambda i: split_records[i]["in_sample_gain"])
+        split_records[best]["selected"] = True
+        records.extend(split_records)
+
+    results = pd.DataFrame(records)
+    selected = results[results["selected"]].reset_index(drop=True) if len(results) else results
+    compounded = np.prod(1 + selected["out_of_sample_gain"].to_numpy() / 100) - 1 if len(selected) else 0.0
+    return {
+        "results": results,
+        "selected": selected,
+        "out_of_sample_gain": float(compounded * 100),
+    }